@@ -0,0 +1,466 @@
+import math
+
+import numpy as np
+
+from main import (
+    AggressiveStrategy,
+    CachedStrategy,
+    DefensiveStrategy,
+    JsonSink,
+    LudoGame,
+    Moves,
+    RandomStrategy,
+    ResultSink,
+    SequentialTest,
+    SmartStrategy,
+    SpeedrunStrategy,
+)
+
+BOARD_LENGTH = LudoGame.BOARD_LENGTH
+HOME_LENGTH = LudoGame.HOME_LENGTH
+
+# Legal move masks store the Moves value of each token's move, 0 means no move
+NO_MOVE = 0
+SPAWN = Moves.spawn.value
+MOVE_TO_POSITION = Moves.move_to_position.value
+MOVE_TO_HOME = Moves.move_to_home.value
+MOVE_INSIDE_HOME = Moves.move_inside_home.value
+CAPTURE_MOVE = Moves.capture_move.value
+
+
+## Move generation
+def roll_dice(rng: np.random.Generator, own_positions: np.ndarray) -> np.ndarray:
+    dice = rng.integers(1, 7, size=(3, len(own_positions)), dtype=np.int16)
+    # Players without a token on the board get up to three tries to roll a six
+    nothing_on_board = ~(own_positions >= 0).any(axis=1)
+    second_chance = np.where(dice[1] == 6, 6, dice[2])
+    return np.where(nothing_on_board & (dice[0] != 6), second_chance, dice[0])
+
+
+def get_legal_moves(
+    positions: np.ndarray,
+    moved_squares: np.ndarray,
+    in_home_positions: np.ndarray,
+    seat: int,
+    dice: np.ndarray,
+    starting_position: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # positions, moved_squares and in_home_positions are shaped (games, players, 4)
+    own_positions = positions[:, seat]
+    own_moved_squares = moved_squares[:, seat]
+    own_home_positions = in_home_positions[:, seat]
+    dice = dice[:, None]
+
+    candidate_moved_squares = own_moved_squares + dice
+    candidate_positions = (own_positions + dice) % BOARD_LENGTH
+    candidate_home_positions = candidate_moved_squares - BOARD_LENGTH
+
+    # Normal move on board, blocked by a token of the same color
+    own_block = (own_positions[:, None, :] == candidate_positions[:, :, None]).any(2)
+    board_move = (
+        (own_positions >= 0) & (candidate_moved_squares < BOARD_LENGTH) & ~own_block
+    )
+    opponent_positions = np.delete(positions, seat, axis=1).reshape(len(positions), -1)
+    capture = board_move & (
+        opponent_positions[:, None, :] == candidate_positions[:, :, None]
+    ).any(2)
+
+    # Move into/within home, no own token may be on or before the target slot
+    occupied_ahead = (
+        own_home_positions[:, None, :] > own_home_positions[:, :, None]
+    ) & (own_home_positions[:, None, :] <= candidate_home_positions[:, :, None])
+    home_move = (
+        (own_positions != -1)
+        & (candidate_moved_squares >= BOARD_LENGTH)
+        & (candidate_home_positions <= HOME_LENGTH)
+        & ~occupied_ahead.any(2)
+    )
+
+    moves = np.zeros(own_positions.shape, dtype=np.int8)
+    moves[board_move] = MOVE_TO_POSITION
+    moves[capture] = CAPTURE_MOVE
+    moves[home_move & (own_home_positions >= 0)] = MOVE_INSIDE_HOME
+    moves[home_move & (own_home_positions < 0)] = MOVE_TO_HOME
+
+    # A legal spawn replaces all other moves and always uses the first token in base
+    in_base = own_positions == -1
+    spawn = (
+        (dice[:, 0] == 6)
+        & in_base.any(1)
+        & ~(own_positions == starting_position).any(1)
+    )
+    moves[spawn] = NO_MOVE
+    moves[spawn, in_base[spawn].argmax(1)] = SPAWN
+
+    return moves, candidate_positions, candidate_home_positions
+
+
+def first_move_of(moves: np.ndarray, target: int) -> np.ndarray:
+    found = moves == target
+    return np.where(found.any(1), found.argmax(1), -1)
+
+
+def prefer(selected: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    return np.where(candidate >= 0, candidate, selected)
+
+
+def only_move(moves: np.ndarray) -> np.ndarray:
+    legal = moves != NO_MOVE
+    return np.where(legal.sum(1) == 1, legal.argmax(1), -1)
+
+
+## Vectorized strategies
+# Every selector returns the index of the selected token per game, or -1 if
+# there is no legal move, and selects exactly what the strategy in main.py would
+def select_speedrun(moves, dice, seat, positions, moved_squares, game, rng):
+    legal = moves != NO_MOVE
+    # Ties go to the lowest token index, like the stable sort in SpeedrunStrategy
+    score = np.where(legal, moved_squares[:, seat], -1)
+    return np.where(legal.any(1), score.argmax(1), -1)
+
+
+def select_defensive(moves, dice, seat, positions, moved_squares, game, rng):
+    to_position = moves == MOVE_TO_POSITION
+    least_moved = np.where(to_position, moved_squares[:, seat], BOARD_LENGTH * 2)
+    selected = np.where(to_position.any(1), least_moved.argmin(1), -1)
+
+    # Priorities from lowest to highest
+    selected = prefer(selected, first_move_of(moves, CAPTURE_MOVE))
+    selected = prefer(selected, first_move_of(moves, MOVE_INSIDE_HOME))
+    selected = prefer(selected, first_move_of(moves, MOVE_TO_HOME))
+    return prefer(selected, only_move(moves))
+
+
+def select_aggressive(moves, dice, seat, positions, moved_squares, game, rng):
+    strategy = game.strategies[seat]
+    own_positions = positions[:, seat]
+    own_moved_squares = moved_squares[:, seat]
+    opponent_positions = np.delete(positions, seat, axis=1).reshape(len(moves), -1)
+    positions_after_turn = own_positions + dice[:, None]
+    moved_squares_after_turn = own_moved_squares + dice[:, None]
+
+    # Accumulate opponent by opponent so the float sums match the serial engine
+    weights = np.zeros(moves.shape)
+    distances_counted = np.zeros(moves.shape, dtype=np.int16)
+    for opponent_index in range(opponent_positions.shape[1]):
+        other_position = opponent_positions[:, opponent_index, None]
+        on_board = other_position >= 0
+        distance = (other_position - positions_after_turn) % BOARD_LENGTH
+        reachable = moved_squares_after_turn + distance <= BOARD_LENGTH
+        was_reachable = (
+            own_moved_squares + (other_position - own_positions) % BOARD_LENGTH
+            <= BOARD_LENGTH
+        )
+        in_reach = on_board & reachable
+        went_out_of_reach = on_board & ~reachable & was_reachable
+
+        min_turn_amount = np.maximum((distance + 5) // 6, 1)
+        weights = weights + np.where(
+            in_reach, strategy.approach_weight / min_turn_amount, 0.0
+        )
+        weights = weights - np.where(went_out_of_reach, strategy.retreat_penalty, 0)
+        distances_counted += in_reach | went_out_of_reach
+    weights = np.where(
+        distances_counted > 0, weights / np.maximum(distances_counted, 1), weights
+    )
+
+    to_position = moves == MOVE_TO_POSITION
+    weights = np.where(to_position, weights, -np.inf)
+    selected = np.where(to_position.any(1), weights.argmax(1), -1)
+
+    # Priorities from lowest to highest
+    selected = prefer(selected, first_move_of(moves, MOVE_INSIDE_HOME))
+    selected = prefer(selected, first_move_of(moves, MOVE_TO_HOME))
+    selected = prefer(selected, first_move_of(moves, CAPTURE_MOVE))
+    return prefer(selected, only_move(moves))
+
+
+def calculate_risk(
+    squares: np.ndarray, positions: np.ndarray, seat: int, game: "BatchLudoGame"
+) -> np.ndarray:
+    strategy = game.strategies[seat]
+    risk_level = np.zeros(squares.shape, dtype=np.int16)
+    for opponent_seat, opponent_start in enumerate(game.starting_positions):
+        if opponent_seat == seat:
+            continue
+        # Increase risk if we are on the spawn point of an opponent
+        risk_level += strategy.spawn_risk * (squares == opponent_start)
+        for token_index in range(4):
+            opp_position = positions[:, opponent_seat, token_index, None]
+            opponent_distance_to_home = (opponent_start - opp_position) % BOARD_LENGTH
+            opponent_distance_to_home[opponent_distance_to_home == 0] = BOARD_LENGTH
+            distance_to_token = (squares - opp_position) % BOARD_LENGTH
+            risk_level += (
+                (opp_position >= 0)
+                & (opponent_distance_to_home >= distance_to_token)
+                & (distance_to_token > 0)
+                & (distance_to_token <= strategy.risk_range)
+            )
+    # Only tokens on the board are at risk
+    return np.where(squares >= 0, risk_level, 0)
+
+
+def select_smart(moves, dice, seat, positions, moved_squares, game, rng):
+    own_positions = positions[:, seat]
+    own_moved_squares = moved_squares[:, seat]
+    candidate_positions = (own_positions + dice[:, None]) % BOARD_LENGTH
+    new_positions = np.where(
+        (moves == MOVE_TO_POSITION) | (moves == CAPTURE_MOVE), candidate_positions, -2
+    )
+
+    current_risks = calculate_risk(own_positions, positions, seat, game)
+    new_risks = calculate_risk(new_positions, positions, seat, game)
+    risk_reductions = (current_risks - new_risks).astype(np.float64)
+    # Weight based on how far the token is
+    progress = own_moved_squares / game.strategies[seat].progress_divisor
+    risk_reductions = np.where(
+        risk_reductions >= 0, risk_reductions + progress, risk_reductions - progress
+    )
+
+    # Walk the moves in order, with the same tie breaking as SmartStrategy
+    games = np.arange(len(moves))
+    best_move = np.full(len(moves), -1)
+    best_risk_reduction = np.zeros(len(moves))
+    for token_index in range(4):
+        move = moves[:, token_index]
+        risk_reduction = risk_reductions[:, token_index]
+        legal = move != NO_MOVE
+        better = legal & (risk_reduction > best_risk_reduction)
+        tie = legal & ~better & (risk_reduction == best_risk_reduction)
+        best_is_capture = (best_move >= 0) & (moves[games, best_move] == CAPTURE_MOVE)
+        take = (
+            better
+            | (tie & (move == CAPTURE_MOVE))
+            | (tie & (move == MOVE_TO_POSITION) & ~best_is_capture)
+        )
+        best_move = np.where(take, token_index, best_move)
+        best_risk_reduction = np.where(take, risk_reduction, best_risk_reduction)
+
+    # Fallback priorities from lowest to highest
+    selected = first_move_of(moves, SPAWN)
+    selected = prefer(selected, first_move_of(moves, MOVE_TO_POSITION))
+    selected = prefer(selected, first_move_of(moves, MOVE_INSIDE_HOME))
+    selected = prefer(selected, first_move_of(moves, CAPTURE_MOVE))
+    selected = prefer(selected, first_move_of(moves, MOVE_TO_HOME))
+    return prefer(selected, best_move)
+
+
+def select_random(moves, dice, seat, positions, moved_squares, game, rng):
+    legal = moves != NO_MOVE
+    legal_count = legal.sum(1)
+    pick = rng.integers(0, np.maximum(legal_count, 1))
+    selected = (legal.cumsum(1) > pick[:, None]).argmax(1)
+    return np.where(legal_count > 0, selected, -1)
+
+
+VECTORIZED_STRATEGIES = {
+    SpeedrunStrategy: select_speedrun,
+    AggressiveStrategy: select_aggressive,
+    DefensiveStrategy: select_defensive,
+    SmartStrategy: select_smart,
+    RandomStrategy: select_random,
+}
+
+
+## Batch game class
+class BatchLudoGame:
+    # Plays many games in lockstep, with the players and strategies of a LudoGame
+    def __init__(self, game: LudoGame | None = None, batch_size: int = 16384):
+        self.game = game if game is not None else LudoGame()
+        self.batch_size = batch_size
+        self.colors = list(self.game.players.keys())
+        self.starting_positions = np.array(
+            [player.starting_position for player in self.game.players.values()]
+        )
+        self.strategies = []
+        self.selectors = []
+        for player in self.game.players.values():
+            strategy = player.strategy
+            # Vectorized strategies need no decision cache
+            if isinstance(strategy, CachedStrategy):
+                strategy = strategy.strategy
+            strategy_type = type(strategy)
+            if strategy_type not in VECTORIZED_STRATEGIES:
+                raise ValueError(
+                    f"{strategy_type.__name__} has no vectorized implementation."
+                )
+            # The selectors read the parameters of the strategies
+            self.strategies.append(strategy)
+            self.selectors.append(VECTORIZED_STRATEGIES[strategy_type])
+
+    def reset_batch(self, number_of_games, rng):
+        shape = (number_of_games, len(self.colors), 4)
+        self.positions = np.full(shape, -1, dtype=np.int16)
+        self.moved_squares = np.zeros(shape, dtype=np.int16)
+        self.in_home_positions = np.full(shape, -1, dtype=np.int16)
+
+        stats_shape = (number_of_games, len(self.colors))
+        self.turns_taken = np.zeros(stats_shape, dtype=np.int32)
+        self.tokens_captured = np.zeros(stats_shape, dtype=np.int32)
+        self.tokens_beaten = np.zeros(stats_shape, dtype=np.int32)
+        self.spawns = np.zeros(stats_shape, dtype=np.int32)
+        self.total_squares_moved = np.zeros(stats_shape, dtype=np.int32)
+        self.games_won = np.zeros(stats_shape, dtype=bool)
+
+        self.turn = rng.integers(0, len(self.colors), number_of_games)
+        self.active = np.ones(number_of_games, dtype=bool)
+
+    def play_turns(self, games, seat, rng):
+        positions = self.positions[games]
+        moved_squares = self.moved_squares[games]
+        dice = roll_dice(rng, positions[:, seat])
+
+        moves, candidate_positions, candidate_home_positions = get_legal_moves(
+            positions,
+            moved_squares,
+            self.in_home_positions[games],
+            seat,
+            dice,
+            self.starting_positions[seat],
+        )
+        selected = self.selectors[seat](
+            moves, dice, seat, positions, moved_squares, self, rng
+        )
+
+        moving = np.flatnonzero(selected >= 0)
+        movers = games[moving]
+        token_index = selected[moving]
+        move = moves[moving, token_index]
+        dice_value = dice[moving]
+
+        spawned = move == SPAWN
+        on_board = (move == MOVE_TO_POSITION) | (move == CAPTURE_MOVE)
+        into_home = (move == MOVE_TO_HOME) | (move == MOVE_INSIDE_HOME)
+        new_positions = np.where(
+            spawned,
+            self.starting_positions[seat],
+            np.where(on_board, candidate_positions[moving, token_index], -2),
+        )
+        self.positions[movers, seat, token_index] = new_positions
+        self.moved_squares[movers, seat, token_index] += np.where(
+            spawned, 0, dice_value
+        )
+        self.in_home_positions[movers, seat, token_index] = np.where(
+            into_home,
+            candidate_home_positions[moving, token_index],
+            self.in_home_positions[movers, seat, token_index],
+        )
+
+        # Handle capturing tokens
+        for other_seat in range(len(self.colors)):
+            if other_seat == seat:
+                continue
+            captured = (
+                self.positions[movers, other_seat] == new_positions[:, None]
+            ) & (new_positions[:, None] >= 0)
+            captured_games, captured_tokens = np.nonzero(captured)
+            self.positions[movers[captured_games], other_seat, captured_tokens] = -1
+            self.moved_squares[movers[captured_games], other_seat, captured_tokens] = 0
+            captured_count = captured.sum(1)
+            self.tokens_captured[movers, seat] += captured_count
+            self.tokens_beaten[movers, other_seat] += captured_count
+
+        # Logging of stats
+        self.spawns[movers, seat] += spawned
+        self.turns_taken[movers, seat] += 1
+        self.total_squares_moved[movers, seat] += dice_value
+
+        winners = movers[(self.positions[movers, seat] == -2).all(1)]
+        self.games_won[winners, seat] = True
+        self.active[winners] = False
+
+        # Player gets another turn if they roll a six and make a legal move
+        next_player = (selected < 0) | (dice != 6)
+        self.turn[games[next_player]] = (seat + 1) % len(self.colors)
+
+    def play_batch(self, number_of_games, rng):
+        self.reset_batch(number_of_games, rng)
+        while self.active.any():
+            games = np.flatnonzero(self.active)
+            seats = self.turn[games]
+            for seat in range(len(self.colors)):
+                seat_games = games[seats == seat]
+                if seat_games.size:
+                    self.play_turns(seat_games, seat, rng)
+
+    # Stats of every game in the batch, in the same format as LudoGame.game_record
+    def game_records(self) -> list[dict[str, list]]:
+        columns = [
+            [
+                self.turns_taken[:, seat].tolist(),
+                self.tokens_captured[:, seat].tolist(),
+                self.tokens_beaten[:, seat].tolist(),
+                self.spawns[:, seat].tolist(),
+                self.total_squares_moved[:, seat].tolist(),
+                self.games_won[:, seat].tolist(),
+            ]
+            for seat in range(len(self.colors))
+        ]
+        return [
+            {
+                color: [column[game] for column in columns[seat]]
+                for seat, color in enumerate(self.colors)
+            }
+            for game in range(len(self.turn))
+        ]
+
+    def simulate_games(
+        self,
+        number_of_games,
+        seed: int | None = None,
+        sink: ResultSink | None = None,
+        confidence: float | None = None,
+    ):
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+        if sink is None:
+            sink = JsonSink()
+        rng = np.random.default_rng(seed)
+
+        sink.open(
+            {
+                "games_played": number_of_games,
+                "seed": seed,
+                "strategies": {
+                    color: player.strategy.name
+                    for color, player in self.game.players.items()
+                },
+            }
+        )
+
+        # Stops between batches once the ranking is settled, see simulate_games
+        # of LudoGame. Games of a batch are played in lockstep, so with a
+        # confidence the batches are at most one chunk of the sink, to test
+        # after every chunk instead of playing a full batch past the stop
+        batch_size = self.batch_size
+        sequential_test = None
+        if confidence:
+            batch_size = max(1, min(batch_size, sink.chunk_size))
+            checks = math.ceil(number_of_games / batch_size)
+            sequential_test = SequentialTest(confidence, checks=checks)
+        games_played = 0
+        for first_game in range(0, number_of_games, batch_size):
+            batch_games = min(batch_size, number_of_games - first_game)
+            print(f"Starting games {first_game + 1}-{first_game + batch_games}...")
+            self.play_batch(batch_games, rng)
+
+            games = self.game_records()
+            for first_record in range(0, len(games), sink.chunk_size):
+                sink.write(games[first_record : first_record + sink.chunk_size])
+            games_played += batch_games
+
+            if sequential_test is not None:
+                for seat, color in enumerate(self.colors):
+                    wins = int(self.games_won[:, seat].sum())
+                    sequential_test.add(color, batch_games, wins)
+                if sequential_test.settled():
+                    break
+
+        summary = {"games_played": games_played, "strategy_reports": {}}
+        if sequential_test is not None:
+            summary["sequential_test"] = sequential_test.report()
+            print(
+                f"Ranking settled: {sequential_test.settled()} after {games_played} games"
+            )
+        sink.close(summary)
+        return summary
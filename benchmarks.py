@@ -0,0 +1,315 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from batch_engine import BatchLudoGame
+from main import STRATEGIES, ColumnarSink, JsonSink, LudoGame, MoveStrategy
+import simulation_plot_lib
+
+# Every benchmark uses the same seeds, so runs play and measure the same games
+SEED = 2024
+
+
+## Recorded positions
+class RecordingStrategy(MoveStrategy):
+    # Records every decision with more than one legal move before passing it on
+    def __init__(self, strategy: MoveStrategy, corpus: list, game: LudoGame):
+        self.strategy = strategy
+        self.corpus = corpus
+        self.game = game
+
+    def select_move(self, legal_moves, dice_roll, player_color, all_players):
+        if len(legal_moves) > 1:
+            self.corpus.append(
+                (self.game.get_state(), legal_moves, dice_roll, player_color)
+            )
+        return self.strategy.select_move(
+            legal_moves, dice_roll, player_color, all_players
+        )
+
+
+def record_positions(number_of_games, seed=SEED) -> list[tuple]:
+    game = LudoGame()
+    corpus = []
+    for player in game.players.values():
+        player.strategy = RecordingStrategy(player.strategy, corpus, game)
+    with contextlib.redirect_stdout(None):
+        game.simulate_game_range(0, number_of_games, seed)
+    return corpus
+
+
+## Timing
+def best_of(repeat, function) -> float:
+    # The fastest run is the one least disturbed by the rest of the machine
+    return min(function() for _ in range(repeat))
+
+
+def result(value, unit, higher_is_better=False) -> dict:
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+## Engine benchmarks
+def bench_simulate_games(number_of_games, repeat, work_dir) -> dict:
+    def run():
+        game = LudoGame()
+        sink = JsonSink(os.path.join(work_dir, "simulate_games.json"))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            game.simulate_games(number_of_games, seed=SEED, sink=sink)
+        return time.perf_counter() - start
+
+    return result(number_of_games / best_of(repeat, run), "games/s", True)
+
+
+def bench_batch_games(number_of_games, repeat, work_dir) -> dict:
+    def run():
+        batch_game = BatchLudoGame(LudoGame())
+        sink = JsonSink(os.path.join(work_dir, "batch_games.json"))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            batch_game.simulate_games(number_of_games, seed=SEED, sink=sink)
+        return time.perf_counter() - start
+
+    return result(number_of_games / best_of(repeat, run), "games/s", True)
+
+
+# Mean microseconds of function(legal_moves, dice_roll, player_color) over the
+# corpus, the state of every position is restored untimed before the call
+def time_positions(game, corpus, function) -> float:
+    total = 0.0
+    for state, legal_moves, dice_roll, player_color in corpus:
+        game.set_state(state)
+        start = time.perf_counter()
+        function(legal_moves, dice_roll, player_color)
+        total += time.perf_counter() - start
+    return total / len(corpus) * 1e6
+
+
+def bench_select_move(corpus, repeat) -> dict[str, dict]:
+    results = {}
+    for strategy_type in STRATEGIES.values():
+        game = LudoGame()
+
+        # A new strategy per run, so no run profits from tables of the one before
+        def run():
+            strategy = strategy_type()
+            strategy.game = game
+            random.seed(SEED)
+
+            def select_move(legal_moves, dice_roll, player_color):
+                strategy.select_move(
+                    legal_moves, dice_roll, player_color, game.players.values()
+                )
+
+            return time_positions(game, corpus, select_move)
+
+        results[f"select_move[{strategy_type.__name__}]"] = result(
+            best_of(repeat, run), "us/call"
+        )
+    return results
+
+
+def bench_get_legal_moves(corpus, repeat, backend) -> dict:
+    game = LudoGame(backend=backend)
+
+    def get_legal_moves(legal_moves, dice_roll, player_color):
+        game.get_legal_moves(player_color, dice_roll)
+
+    return result(
+        best_of(repeat, lambda: time_positions(game, corpus, get_legal_moves)),
+        "us/call",
+    )
+
+
+def bench_move_token(corpus, repeat, backend) -> dict:
+    game = LudoGame(backend=backend)
+
+    def move_token(legal_moves, dice_roll, player_color):
+        game.move_token(player_color, legal_moves[0][0], dice_roll)
+
+    return result(
+        best_of(repeat, lambda: time_positions(game, corpus, move_token)), "us/call"
+    )
+
+
+## Metrics benchmarks
+def write_synthetic_columns(path, number_of_games, seed=SEED):
+    # Random statistics in the ranges of real games, with one winner per game
+    rng = np.random.default_rng(seed)
+    strategies = {
+        color: player.strategy.name for color, player in LudoGame().players.items()
+    }
+    sink = ColumnarSink(path, chunk_size=number_of_games)
+    sink.open({"games_played": number_of_games, "seed": seed, "strategies": strategies})
+    winners = rng.integers(0, len(strategies), number_of_games)
+    for seat, columns in enumerate(sink.columns.values()):
+        columns["turns_taken"][:] = rng.integers(40, 160, number_of_games)
+        columns["tokens_captured"][:] = rng.integers(0, 16, number_of_games)
+        columns["tokens_beaten"][:] = rng.integers(0, 16, number_of_games)
+        columns["spawns"][:] = rng.integers(4, 20, number_of_games)
+        columns["total_squares_moved"][:] = rng.integers(100, 400, number_of_games)
+        columns["games_won"][:] = winners == seat
+        for column in columns.values():
+            column.flush()
+    sink.header["games_played"] = number_of_games
+    sink.close({"strategy_reports": {}})
+
+
+def bench_calculate_metrics(number_of_games, repeat, work_dir) -> dict[str, dict]:
+    path = os.path.join(work_dir, f"synthetic_{number_of_games}.columns")
+    write_synthetic_columns(path, number_of_games)
+
+    # overwrite recalculates the metrics, otherwise they come from the cache
+    # file once the in-memory metrics are dropped
+    def run(cached):
+        simulation_plot_lib.metrics = None
+        start = time.perf_counter()
+        simulation_plot_lib.calculate_metrics(overwrite=not cached, path=path)
+        return (time.perf_counter() - start) * 1e3
+
+    return {
+        f"calculate_metrics[{number_of_games}]": result(
+            best_of(repeat, lambda: run(False)), "ms"
+        ),
+        f"calculate_metrics_cached[{number_of_games}]": result(
+            best_of(repeat, lambda: run(True)), "ms"
+        ),
+    }
+
+
+## Suite
+def run_benchmarks(args) -> dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        print("simulate_games...")
+        results["simulate_games"] = bench_simulate_games(
+            args.games, args.repeat, work_dir
+        )
+        print("batch simulate_games...")
+        results["batch_simulate_games"] = bench_batch_games(
+            args.batch_games, args.repeat, work_dir
+        )
+
+        print("Recording positions...")
+        corpus = record_positions(args.corpus_games)
+        print(f"select_move on {len(corpus)} positions...")
+        results.update(bench_select_move(corpus, args.repeat))
+        for backend in ("occupancy", "bitboard"):
+            results[f"get_legal_moves[{backend}]"] = bench_get_legal_moves(
+                corpus, args.repeat, backend
+            )
+            results[f"move_token[{backend}]"] = bench_move_token(
+                corpus, args.repeat, backend
+            )
+
+        for number_of_games in args.metrics_sizes:
+            print(f"calculate_metrics on {number_of_games} games...")
+            results.update(
+                bench_calculate_metrics(number_of_games, args.repeat, work_dir)
+            )
+    return results
+
+
+def print_results(results):
+    for name, row in results.items():
+        print(f"{name:<40} {row['value']:>14.3f} {row['unit']}")
+
+
+# Prints the change of every benchmark against the baseline and returns the
+# names of the ones that got worse by more than the tolerance
+def compare(results, baseline, tolerance) -> list[str]:
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, row in results.items():
+        if name not in baseline:
+            print(f"{name:<40} {'-':>12} {row['value']:>12.3f}")
+            continue
+        old_value = baseline[name]["value"]
+        change = row["value"] / old_value - 1
+        # Positive changes are improvements
+        improvement = change if row["higher_is_better"] else -change
+        marker = ""
+        if improvement < -tolerance:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<40} {old_value:>12.3f} {row['value']:>12.3f} "
+            f"{change:>+9.1%}{marker}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the engine, strategies and metrics."
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark_results.json",
+        help="JSON file the results are written to",
+    )
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="JSON results of an earlier run"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="relative slowdown reported as a regression",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument(
+        "--games", type=int, default=200, help="games of simulate_games"
+    )
+    parser.add_argument(
+        "--batch-games", type=int, default=4096, help="games of the batch engine"
+    )
+    parser.add_argument(
+        "--corpus-games",
+        type=int,
+        default=20,
+        help="games recorded for the select_move corpus",
+    )
+    parser.add_argument(
+        "--metrics-sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="games of the synthetic calculate_metrics results",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    print_results(results)
+
+    with open(args.output, "w") as output_file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": SEED,
+                "settings": {
+                    "games": args.games,
+                    "batch_games": args.batch_games,
+                    "corpus_games": args.corpus_games,
+                    "repeat": args.repeat,
+                },
+                "benchmarks": results,
+            },
+            output_file,
+            indent=4,
+        )
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["benchmarks"]
+        if compare(results, baseline, args.tolerance):
+            raise SystemExit(1)
@@ -0,0 +1,335 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+from statistics import NormalDist
+import time
+
+from main import STRATEGIES, DiceStream, LudoGame, parse_seat
+
+
+## Paired games
+# Wins of the color with every strategy on games first_game to last_game. All
+# strategies play the same seeded games, so they see the same dice and
+# starting players. With antithetic the games are also played with 7 - d.
+# Returns wins[strategy][stream][game]
+def play_paired_unit(
+    color, strategy_factories, opponents, first_game, last_game, seed, antithetic
+) -> list[list[list[int]]]:
+    streams = (False, True) if antithetic else (False,)
+    wins = []
+    for strategy_factory in strategy_factories:
+        strategy_wins = []
+        for antithetic_stream in streams:
+            strategies = {
+                opponent_color: STRATEGIES[name]()
+                for opponent_color, name in opponents.items()
+            }
+            strategies[color] = strategy_factory()
+            # Every player rolls from an own stream, so the opponents keep
+            # their dice when the compared strategies move differently
+            dice = DiceStream(antithetic=antithetic_stream, per_player=True)
+            game = LudoGame(strategies=strategies, dice=dice)
+            with contextlib.redirect_stdout(None):
+                games, _, _ = game.simulate_game_range(first_game, last_game, seed)
+            strategy_wins.append([int(record[color][-1]) for record in games])
+        wins.append(strategy_wins)
+    return wins
+
+
+## Paired statistics
+# Difference of the candidate's and baseline's win rate from paired games,
+# kept as running sums. Every pair is one game number, with antithetic dice
+# its win rates are the means over both dice streams. Like SequentialTest, the
+# interval is tested up to checks times, so its error is the error allowed by
+# the confidence split over all checks (Bonferroni)
+class PairedDifference:
+    def __init__(
+        self,
+        streams: int = 1,
+        confidence: float = 0.99,
+        min_pairs=100,
+        checks: int = 1,
+    ):
+        self.streams = streams
+        self.confidence = confidence
+        self.min_pairs = min_pairs
+        self.checks = checks
+        self.z = NormalDist().inv_cdf((1 + self.interval_confidence()) / 2)
+        self.pairs = 0
+        self.baseline_wins = 0.0
+        self.candidate_wins = 0.0
+        self.difference_sum = 0.0
+        self.squared_difference_sum = 0.0
+
+    def add(self, baseline_rate, candidate_rate):
+        difference = candidate_rate - baseline_rate
+        self.pairs += 1
+        self.baseline_wins += baseline_rate
+        self.candidate_wins += candidate_rate
+        self.difference_sum += difference
+        self.squared_difference_sum += difference * difference
+
+    def add_unit(self, wins):
+        baseline, candidate = wins
+        for game_index in range(len(baseline[0])):
+            self.add(
+                sum(stream[game_index] for stream in baseline) / self.streams,
+                sum(stream[game_index] for stream in candidate) / self.streams,
+            )
+
+    # Confidence of the interval at a single check
+    def interval_confidence(self) -> float:
+        return 1 - (1 - self.confidence) / self.checks
+
+    def win_rates(self) -> tuple[float, float]:
+        return self.baseline_wins / self.pairs, self.candidate_wins / self.pairs
+
+    def mean_difference(self) -> float:
+        return self.difference_sum / self.pairs
+
+    def standard_error(self) -> float:
+        if self.pairs < 2:
+            return math.inf
+        mean = self.mean_difference()
+        variance = (self.squared_difference_sum - self.pairs * mean * mean) / (
+            self.pairs - 1
+        )
+        return math.sqrt(max(variance, 0.0) / self.pairs)
+
+    # Standard error the same number of games would have without pairing
+    def independent_standard_error(self) -> float:
+        baseline_rate, candidate_rate = self.win_rates()
+        games = self.pairs * self.streams
+        return math.sqrt(
+            (
+                baseline_rate * (1 - baseline_rate)
+                + candidate_rate * (1 - candidate_rate)
+            )
+            / games
+        )
+
+    def interval(self) -> tuple[float, float]:
+        half_width = self.z * self.standard_error()
+        return self.mean_difference() - half_width, self.mean_difference() + half_width
+
+    # How many times more games independent runs need for the same precision
+    def variance_reduction(self) -> float | None:
+        standard_error = self.standard_error()
+        if standard_error == 0 or math.isinf(standard_error):
+            return None
+        return (self.independent_standard_error() / standard_error) ** 2
+
+    # True once the interval of the difference excludes zero
+    def settled(self) -> bool:
+        low, high = self.interval()
+        return self.pairs >= self.min_pairs and (low > 0 or high < 0)
+
+    def report(self) -> dict:
+        baseline_rate, candidate_rate = self.win_rates()
+        return {
+            "pairs": self.pairs,
+            "games_per_strategy": self.pairs * self.streams,
+            "baseline_win_rate": baseline_rate,
+            "candidate_win_rate": candidate_rate,
+            "mean_difference": self.mean_difference(),
+            "standard_error": self.standard_error(),
+            "confidence": self.confidence,
+            "checks": self.checks,
+            "interval_confidence": self.interval_confidence(),
+            "interval": list(self.interval()),
+            "independent_standard_error": self.independent_standard_error(),
+            "variance_reduction": self.variance_reduction(),
+            "settled": self.settled(),
+        }
+
+
+## Comparison
+def compare_strategies(
+    color: str,
+    baseline,
+    candidate,
+    number_of_games: int = 1000,
+    opponents: dict[str, str] | None = None,
+    antithetic: bool = False,
+    workers: int | None = None,
+    unit_size: int = 50,
+    seed: int | None = None,
+    confidence: float = 0.99,
+    stop_when_settled: bool = False,
+    units_per_check: int = 8,
+) -> dict:
+    # baseline and candidate create the strategies, e.g. a strategy class or a
+    # functools.partial with its parameters. The other seats keep their default
+    # strategies unless opponents names them
+    if color not in LudoGame.STARTING_POSITIONS:
+        raise ValueError(f"Unknown player color {color}.")
+    if number_of_games < 1 or unit_size < 1 or units_per_check < 1:
+        raise ValueError(
+            "number_of_games, unit_size and units_per_check have to be at least 1."
+        )
+    opponents = dict(opponents or {})
+    opponents.pop(color, None)
+    if seed is None:
+        seed = random.randrange(2**32)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    units = [
+        (first_game, min(first_game + unit_size, number_of_games))
+        for first_game in range(0, number_of_games, unit_size)
+    ]
+    # When stopping early the units are played in rounds of units_per_check,
+    # otherwise all at once. The rounds do not depend on the worker count, so
+    # a seeded comparison stops at the same game on every machine
+    round_size = units_per_check if stop_when_settled else max(len(units), 1)
+    difference = PairedDifference(
+        2 if antithetic else 1,
+        confidence,
+        checks=math.ceil(len(units) / round_size) if stop_when_settled else 1,
+    )
+
+    start_time = time.perf_counter()
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for first_unit in range(0, len(units), round_size):
+            round_arguments = [
+                (color, (baseline, candidate), opponents, first, last, seed, antithetic)
+                for first, last in units[first_unit : first_unit + round_size]
+            ]
+            if executor is None:
+                unit_results = (
+                    play_paired_unit(*arguments) for arguments in round_arguments
+                )
+            else:
+                from concurrent.futures import as_completed
+
+                futures = [
+                    executor.submit(play_paired_unit, *arguments)
+                    for arguments in round_arguments
+                ]
+                unit_results = (future.result() for future in as_completed(futures))
+            for wins in unit_results:
+                difference.add_unit(wins)
+
+            if stop_when_settled and difference.settled():
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "settings": {
+            "color": color,
+            "opponents": opponents,
+            "number_of_games": number_of_games,
+            "antithetic": antithetic,
+            "seed": seed,
+            "stop_when_settled": stop_when_settled,
+            "units_per_check": units_per_check,
+        },
+        "seconds": time.perf_counter() - start_time,
+        **difference.report(),
+    }
+
+
+def print_comparison(results, baseline_name, candidate_name):
+    low, high = results["interval"]
+    print(
+        f"{baseline_name} win rate: {results['baseline_win_rate']:.4f}\n"
+        f"{candidate_name} win rate: {results['candidate_win_rate']:.4f}\n"
+        f"Difference: {results['mean_difference']:+.4f} "
+        f"[{low:+.4f}, {high:+.4f}] at {results['confidence']} confidence "
+        f"over {results['checks']} checks\n"
+        f"Standard error paired: {results['standard_error']:.4f}, "
+        f"independent: {results['independent_standard_error']:.4f}"
+    )
+    if results["variance_reduction"] is not None:
+        print(
+            f"Independent runs would need {results['variance_reduction']:.1f} "
+            f"times as many games for the same precision"
+        )
+    settled = "settled" if results["settled"] else "not settled"
+    print(f"Difference {settled} after {results['pairs']} paired games")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare two strategies on one seat with the same dice."
+    )
+    parser.add_argument("--color", default="yellow", help="seat of the strategies")
+    parser.add_argument(
+        "--baseline", choices=STRATEGIES, default="smart", help="baseline strategy"
+    )
+    parser.add_argument(
+        "--candidate", choices=STRATEGIES, required=True, help="candidate strategy"
+    )
+    parser.add_argument(
+        "--seat",
+        type=parse_seat,
+        action="append",
+        default=[],
+        metavar="COLOR=STRATEGY",
+        help="strategy of another seat (repeatable)",
+    )
+    parser.add_argument(
+        "-n", "--games", type=int, default=1000, help="paired games to play at most"
+    )
+    parser.add_argument(
+        "--antithetic",
+        action="store_true",
+        help="also play every game with the antithetic dice 7 - d",
+    )
+    parser.add_argument(
+        "--confidence", type=float, default=0.99, help="confidence of the interval"
+    )
+    parser.add_argument(
+        "--stop-when-settled",
+        action="store_true",
+        help="stop once the interval of the difference excludes zero",
+    )
+    parser.add_argument(
+        "--units-per-check",
+        type=int,
+        default=8,
+        help="work units played between the checks of --stop-when-settled",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--unit-size", type=int, default=50, help="games per unit")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the games")
+    parser.add_argument(
+        "-o", "--output", default="comparison.json", help="results file"
+    )
+    args = parser.parse_args()
+    if not 0 < args.confidence < 1:
+        parser.error("the confidence has to be between 0 and 1")
+
+    try:
+        results = compare_strategies(
+            args.color,
+            STRATEGIES[args.baseline],
+            STRATEGIES[args.candidate],
+            args.games,
+            dict(args.seat),
+            args.antithetic,
+            args.workers,
+            args.unit_size,
+            args.seed,
+            args.confidence,
+            args.stop_when_settled,
+            args.units_per_check,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    results["settings"]["baseline"] = args.baseline
+    results["settings"]["candidate"] = args.candidate
+    print_comparison(results, args.baseline, args.candidate)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
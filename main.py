@@ -1,8 +1,10 @@
-from copy import deepcopy
+import argparse
+from collections import OrderedDict, deque
 from enum import Enum
 import json
 import math
 import random
+from statistics import NormalDist
 import os
 import time
 
@@ -73,10 +75,508 @@ class GameStats:
         self.turns_until_win = 0
 
 
+## Zobrist hashing
+class ZobristKeys:
+    def __init__(self, colors):
+        # Keys only depend on the color and token index, so hashes are the same
+        # in every game and process
+        self.token_keys = {
+            color: [
+                self.random_keys(f"{color}:{token_index}") for token_index in range(4)
+            ]
+            for color in colors
+        }
+        self.turn_keys = {color: self.random_keys(color)[0][0] for color in colors}
+
+    @staticmethod
+    def random_keys(name) -> tuple[list[int], list[int], list[int]]:
+        rng = random.Random(f"zobrist:{name}")
+        return (
+            # position -2 to 39
+            [rng.getrandbits(64) for _ in range(LudoGame.BOARD_LENGTH + 2)],
+            # moved_squares 0 to 43
+            [
+                rng.getrandbits(64)
+                for _ in range(LudoGame.BOARD_LENGTH + LudoGame.HOME_LENGTH + 1)
+            ],
+            # in_home_position -1 to 3
+            [rng.getrandbits(64) for _ in range(LudoGame.HOME_LENGTH + 2)],
+        )
+
+    def token_key(self, color, token_index, token: Token) -> int:
+        position_keys, moved_squares_keys, home_keys = self.token_keys[color][
+            token_index
+        ]
+        return (
+            position_keys[token.position + 2]
+            ^ moved_squares_keys[token.moved_squares]
+            ^ home_keys[token.in_home_position + 1]
+        )
+
+    def turn_key(self, color) -> int:
+        return self.turn_keys.get(color, 0)
+
+
+## Bounded cache, evicts the least recently used entry when full
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+## Dice
+# Serves dice rolls from blocks drawn by a NumPy generator, which is cheaper
+# than one random.randint call per roll. With record=True the rolls served
+# since the last reseed are kept in rolls, replay() serves recorded rolls again.
+# An antithetic stream rolls 7 - d where the same seed rolls d. With per_player
+# every player rolls from an own stream, so a different move of one player does
+# not shift the rolls of the others
+class DiceStream:
+    def __init__(
+        self,
+        seed=None,
+        block_size: int = 512,
+        record: bool = False,
+        antithetic: bool = False,
+        per_player: bool = False,
+    ):
+        self.block_size = block_size
+        self.record = record
+        self.antithetic = antithetic
+        self.per_player = per_player
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        # Imported here, so that importing the engine does not load NumPy
+        from numpy.random import SeedSequence, default_rng
+
+        if not isinstance(seed, SeedSequence):
+            seed = SeedSequence(seed)
+        self.seed_sequence = seed
+        self.rng = default_rng(self.seed_sequence)
+        self.player_streams: dict[int, DiceStream] = {}
+        self.buffer: list[int] = []
+        self.index = 0
+        self.replaying = False
+        self.rolls: list[int] = []
+
+    # Stream of a player, seeded by the player and not the order of the rolls
+    def player_stream(self, player: int) -> "DiceStream":
+        stream = self.player_streams.get(player)
+        if stream is None:
+            from numpy.random import SeedSequence
+
+            seed = SeedSequence(self.seed_sequence.entropy, spawn_key=(player,))
+            stream = DiceStream(seed, self.block_size, antithetic=self.antithetic)
+            self.player_streams[player] = stream
+        return stream
+
+    def replay(self, rolls: list[int]):
+        self.buffer = list(rolls)
+        self.index = 0
+        self.replaying = True
+        self.rolls = []
+
+    def roll(self, player: int = 0) -> int:
+        if self.per_player and not self.replaying:
+            value = self.player_stream(player).roll()
+            if self.record:
+                self.rolls.append(value)
+            return value
+
+        if self.index == len(self.buffer):
+            if self.replaying:
+                raise IndexError("All recorded dice rolls have been replayed.")
+            block = self.rng.integers(1, 7, self.block_size)
+            if self.antithetic:
+                block = 7 - block
+            self.buffer = block.tolist()
+            self.index = 0
+        value = self.buffer[self.index]
+        self.index += 1
+        if self.record:
+            self.rolls.append(value)
+        return value
+
+
+## Event tracing
+class TraceEventKind(Enum):
+    roll = 1
+    spawn = 2
+    move = 3
+    home = 4
+    capture = 5
+    win = 6
+
+
+class TraceEvent:
+    def __init__(
+        self,
+        kind: TraceEventKind,
+        color: str,
+        token_index: int | None = None,
+        dice_value: int | None = None,
+        position: int | None = None,  # board position, home slot for home events
+        previous_position: int | None = None,  # -1 when entering home
+        other_color: str | None = None,  # owner of the captured token
+    ):
+        self.kind = kind
+        self.color = color
+        self.token_index = token_index
+        self.dice_value = dice_value
+        self.position = position
+        self.previous_position = previous_position
+        self.other_color = other_color
+
+
+# Passes the events of a game to its sinks, any callable taking a TraceEvent.
+# Call sites check enabled first, so without sinks no event is ever built
+class Tracer:
+    def __init__(self):
+        self.sinks = []
+        self.enabled = False
+
+    def attach(self, sink):
+        self.sinks.append(sink)
+        self.enabled = True
+
+    def detach(self, sink):
+        self.sinks.remove(sink)
+        self.enabled = bool(self.sinks)
+
+    def emit(self, event: TraceEvent):
+        for sink in self.sinks:
+            sink(event)
+
+
+# Prints the events like the console game always did
+def console_trace_sink(event: TraceEvent):
+    color = event.color
+    if event.kind == TraceEventKind.roll:
+        print(f"{color} rolled a {event.dice_value}")
+    elif event.kind == TraceEventKind.spawn:
+        print(f"{color} spawned a token at position {event.position}")
+    elif event.kind == TraceEventKind.move:
+        print(f"{color} moved a token to position {event.position}")
+    elif event.kind == TraceEventKind.home:
+        if event.previous_position == -1:
+            print(f"{color} moved a token into home.")
+        else:
+            print(f"{color} moved a token within home.")
+    elif event.kind == TraceEventKind.capture:
+        print(f"{color}'s token captured {event.other_color}'s token!")
+    elif event.kind == TraceEventKind.win:
+        print(f"Game over! {color} wins!")
+
+
+## Profiling
+# Wall time and number of calls per phase of the game loop. Phases are timed
+# by wrapping the functions play_game calls, so nothing is timed without a
+# profiler
+class Profiler:
+    # Phases timed inside another phase, their time is part of the outer one
+    NESTED_PHASES = {"capture": "move_token"}
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+
+    def reset(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def add(self, phase: str, seconds: float):
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+    def timed(self, phase: str, function):
+        timer = time.perf_counter
+
+        def timed_function(*args):
+            start = timer()
+            result = function(*args)
+            self.add(phase, timer() - start)
+            return result
+
+        return timed_function
+
+    # Counters of every phase, as passed back from worker processes
+    def snapshot(self) -> dict[str, list]:
+        return {phase: [self.calls[phase], self.seconds[phase]] for phase in self.calls}
+
+    def merge(self, snapshot: dict[str, list]):
+        for phase, (calls, seconds) in snapshot.items():
+            self.calls[phase] = self.calls.get(phase, 0) + calls
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+    # Phases ordered by their total time, as stored in the results. Nested
+    # phases follow the phase they are timed in and name it in "within"
+    def report(self) -> dict[str, dict]:
+        phases = sorted(self.calls, key=self.seconds.get, reverse=True)
+        report = {}
+        for phase in phases:
+            if self.NESTED_PHASES.get(phase) in self.calls:
+                continue
+            report[phase] = self.phase_report(phase)
+            for inner_phase in phases:
+                if self.NESTED_PHASES.get(inner_phase) == phase:
+                    report[inner_phase] = self.phase_report(inner_phase)
+                    report[inner_phase]["within"] = phase
+        return report
+
+    def phase_report(self, phase) -> dict:
+        return {
+            "calls": self.calls[phase],
+            "seconds": self.seconds[phase],
+            "microseconds_per_call": self.seconds[phase] / self.calls[phase] * 1e6,
+        }
+
+    # Nested phases are indented and left out of the total
+    def summary_table(self) -> str:
+        lines = [f"{'phase':<32} {'calls':>10} {'seconds':>9} {'us/call':>9}"]
+        total = 0.0
+        for phase, row in self.report().items():
+            if "within" in row:
+                phase = f"  {phase}"
+            else:
+                total += row["seconds"]
+            lines.append(
+                f"{phase:<32} {row['calls']:>10} {row['seconds']:>9.3f} "
+                f"{row['microseconds_per_call']:>9.2f}"
+            )
+        lines.append(f"{'total':<32} {'':>10} {total:>9.3f}")
+        return "\n".join(lines)
+
+
+## Sequential testing
+# Wilson score interval of a win rate
+def wilson_interval(wins, games, z) -> tuple[float, float]:
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    half_width = (
+        z
+        * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games))
+        / (1 + z * z / games)
+    )
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+# Win rates that are updated after every batch of games. The ranking is settled
+# once the intervals of neighbours in the ranking do not overlap. The test is
+# repeated up to checks times, so the error of every interval is the error
+# allowed by the confidence split over all checks and players (Bonferroni).
+# Then the chance of declaring a wrong ranking at any check is at most
+# 1 - confidence
+class SequentialTest:
+    def __init__(self, confidence: float = 0.99, min_games: int = 100, checks: int = 1):
+        self.confidence = confidence
+        self.min_games = min_games
+        self.checks = checks
+        self.games: dict[str, int] = {}
+        self.wins: dict[str, int] = {}
+
+    def add(self, name, games, wins):
+        self.games[name] = self.games.get(name, 0) + games
+        self.wins[name] = self.wins.get(name, 0) + wins
+
+    def win_rate(self, name) -> float:
+        return self.wins[name] / self.games[name] if self.games[name] else 0.0
+
+    # Confidence of every single interval
+    def interval_confidence(self) -> float:
+        return 1 - (1 - self.confidence) / (self.checks * max(len(self.games), 1))
+
+    def intervals(self) -> dict[str, tuple[float, float]]:
+        z = NormalDist().inv_cdf((1 + self.interval_confidence()) / 2)
+        return {
+            name: wilson_interval(self.wins[name], self.games[name], z)
+            for name in self.games
+        }
+
+    def ranking(self) -> list[str]:
+        return sorted(self.games, key=self.win_rate, reverse=True)
+
+    def settled(self) -> bool:
+        if not self.games or min(self.games.values()) < self.min_games:
+            return False
+        intervals = self.intervals()
+        ranking = self.ranking()
+        return all(
+            intervals[better][0] > intervals[worse][1]
+            for better, worse in zip(ranking, ranking[1:])
+        )
+
+    def report(self) -> dict:
+        intervals = self.intervals()
+        return {
+            "confidence": self.confidence,
+            "checks": self.checks,
+            "interval_confidence": self.interval_confidence(),
+            "settled": self.settled(),
+            "ranking": self.ranking(),
+            "games": self.games,
+            "win_rates": {name: self.win_rate(name) for name in self.games},
+            "intervals": {name: list(interval) for name, interval in intervals.items()},
+        }
+
+
+## Undo information for LudoGame.make_move
+class UndoRecord:
+    def __init__(self, player_color, token_index, dice_value, token: Token):
+        self.player_color = player_color
+        self.token_index = token_index
+        self.dice_value = dice_value
+        # Token state before the move
+        self.position = token.position
+        self.moved_squares = token.moved_squares
+        self.in_home_position = token.in_home_position
+        # (color, token_index, position, moved_squares) of a captured token
+        self.captured: tuple[str, int, int, int] | None = None
+
+
+## Board state backends
+# Both backends answer the same queries for LudoGame, which keeps them in sync
+# with the tokens on spawn, move, capture and reset
+class OccupancyIndex:
+    def __init__(self, players: dict[str, Player]):
+        self.colors = list(players.keys())
+        self.reset()
+
+    def reset(self):
+        # Every square holds at most one token, as arriving tokens capture
+        self.board: list[tuple[str, int] | None] = [None] * LudoGame.BOARD_LENGTH
+        self.home_slots = {
+            color: [False] * (LudoGame.HOME_LENGTH + 1) for color in self.colors
+        }
+
+    def occupant(self, position) -> tuple[str, int] | None:
+        return self.board[position]
+
+    def is_occupied(self, position) -> bool:
+        return self.board[position] is not None
+
+    def has_own_token(self, color, position) -> bool:
+        occupant = self.board[position]
+        return occupant is not None and occupant[0] == color
+
+    def place(self, color, token_index, position):
+        self.board[position] = (color, token_index)
+
+    def remove(self, color, position):
+        self.board[position] = None
+
+    def is_home_slot_taken(self, color, home_position) -> bool:
+        return self.home_slots[color][home_position]
+
+    # True if no own token is between the current and the candidate home position
+    def home_path_clear(self, color, home_position, candidate_home_position) -> bool:
+        return not any(
+            self.home_slots[color][home_position + 1 : candidate_home_position + 1]
+        )
+
+    def move_in_home(self, color, home_position, candidate_home_position):
+        if home_position >= 0:
+            self.home_slots[color][home_position] = False
+        self.home_slots[color][candidate_home_position] = True
+
+    def leave_home(self, color, home_position):
+        self.home_slots[color][home_position] = False
+
+
+class BitboardIndex:
+    def __init__(self, players: dict[str, Player]):
+        self.players = players
+        self.reset()
+
+    def reset(self):
+        # Bit n of a board is set if the color has a token on square n, bit n
+        # of a home mask is set if the color has a token in home position n
+        self.boards = {color: 0 for color in self.players}
+        self.occupied = 0
+        self.home_masks = {color: 0 for color in self.players}
+        # Index of the token on every square, only valid where occupied is set,
+        # so the bitboards give the color and this the token without a scan
+        self.token_indices = [0] * LudoGame.BOARD_LENGTH
+
+    def occupant(self, position) -> tuple[str, int] | None:
+        bit = 1 << position
+        if not self.occupied & bit:
+            return None
+        for color, board in self.boards.items():
+            if board & bit:
+                return color, self.token_indices[position]
+
+    def is_occupied(self, position) -> bool:
+        return self.occupied >> position & 1 == 1
+
+    def has_own_token(self, color, position) -> bool:
+        return self.boards[color] >> position & 1 == 1
+
+    def place(self, color, token_index, position):
+        bit = 1 << position
+        self.boards[color] |= bit
+        self.occupied |= bit
+        self.token_indices[position] = token_index
+
+    def remove(self, color, position):
+        mask = ~(1 << position)
+        self.boards[color] &= mask
+        self.occupied &= mask
+
+    def is_home_slot_taken(self, color, home_position) -> bool:
+        return self.home_masks[color] >> home_position & 1 == 1
+
+    # True if no own token is between the current and the candidate home position
+    def home_path_clear(self, color, home_position, candidate_home_position) -> bool:
+        path = (1 << candidate_home_position + 1) - (1 << home_position + 1)
+        return not self.home_masks[color] & path
+
+    def move_in_home(self, color, home_position, candidate_home_position):
+        if home_position >= 0:
+            self.home_masks[color] &= ~(1 << home_position)
+        self.home_masks[color] |= 1 << candidate_home_position
+
+    def leave_home(self, color, home_position):
+        self.home_masks[color] &= ~(1 << home_position)
+
+
+STATE_BACKENDS = {"occupancy": OccupancyIndex, "bitboard": BitboardIndex}
+
+
 ## Main game class
 class LudoGame:
     BOARD_LENGTH = 40
     HOME_LENGTH = 4 - 1
+    STARTING_POSITIONS = {"red": 0, "green": 10, "yellow": 20, "blue": 30}
+    RESULT_FIELDS = (
+        "turns_taken",
+        "tokens_captured",
+        "tokens_beaten",
+        "spawns",
+        "total_squares_moved",
+        "games_won",
+    )
 
     def __init__(
         self,
@@ -84,19 +584,66 @@ class LudoGame:
         interactive: bool = False,
         turnTime: float = 0,
         starting_player: str = "random",
+        backend: str = "occupancy",
+        strategies: "dict[str, MoveStrategy] | None" = None,
+        dice: DiceStream | None = None,
+        profile: bool = False,
+        colors: list[str] | None = None,
     ):
         self.clearConsole = clearConsole
         self.interactive = interactive
         self.turnTime = turnTime
+        self.starting_player = starting_player
+        self.dice = dice if dice is not None else DiceStream()
+        self.tracer = Tracer()
+        self.profiler = Profiler() if profile else None
+        if ENABLE_CONSOLE:
+            self.tracer.attach(console_trace_sink)
+
+        # Default strategy of each seat, replaced by the ones given per color
+        seat_strategies = {
+            "red": AggressiveStrategy(),
+            "green": DefensiveStrategy(),
+            "yellow": SmartStrategy(),
+            # "blue": RandomStrategy(),
+            "blue": SpeedrunStrategy(),
+        }
+        if strategies is not None:
+            for color in strategies:
+                if color not in seat_strategies:
+                    raise ValueError(f"Unknown player color {color}.")
+            seat_strategies.update(strategies)
+
+        # All four seats play unless only some colors are given
+        if colors is None:
+            colors = list(self.STARTING_POSITIONS)
+        for color in colors:
+            if color not in self.STARTING_POSITIONS:
+                raise ValueError(f"Unknown player color {color}.")
+        if len(set(colors)) < 2:
+            raise ValueError("A game needs at least two players.")
 
         self.players = {
-            "red": Player("red", 0, AggressiveStrategy()),
-            "green": Player("green", 10, DefensiveStrategy()),
-            "yellow": Player("yellow", 20, SmartStrategy()),
-            # "blue": Player("blue", 30, RandomStrategy()),
-            "blue": Player("blue", 30, SpeedrunStrategy()),
+            color: Player(color, self.STARTING_POSITIONS[color], seat_strategies[color])
+            for color in self.STARTING_POSITIONS
+            if color in colors
         }
 
+        # Search strategies explore moves on the game they are playing in
+        for player in self.players.values():
+            player.strategy.game = self
+
+        if backend not in STATE_BACKENDS:
+            raise ValueError(f"Unknown state backend {backend}.")
+        self.backend = backend
+        self.occupancy = STATE_BACKENDS[backend](self.players)
+
+        # 64-bit hash of all tokens and the side to move, kept up to date by
+        # make_move, unmake_move, reset_game and the turn setter
+        self.zobrist = ZobristKeys(list(self.players.keys()))
+        self._turn = None
+        self.zobrist_hash = self.compute_zobrist_hash()
+
         if starting_player == "random":
             self.turn = random.choice(list(self.players.keys()))
         else:
@@ -104,15 +651,40 @@ class LudoGame:
 
     @staticmethod
     def get_reachable_distance_between(token1: Token, token2: Token) -> int:
-        if token1.position < 0 or token2.position < 0:
+        return LudoGame.get_reachable_distance(
+            token1.position, token1.moved_squares, token2.position
+        )
+
+    # Same as get_reachable_distance_between, but for hypothetical positions
+    @staticmethod
+    def get_reachable_distance(position1, moved_squares1, position2) -> int:
+        if position1 < 0 or position2 < 0:
             return -2
-        distance = (token2.position - token1.position) % LudoGame.BOARD_LENGTH
-        if token1.moved_squares + distance > LudoGame.BOARD_LENGTH:
+        distance = (position2 - position1) % LudoGame.BOARD_LENGTH
+        if moved_squares1 + distance > LudoGame.BOARD_LENGTH:
             return -1
         return distance
 
+    @property
+    def turn(self):
+        return self._turn
+
+    @turn.setter
+    def turn(self, color):
+        self.zobrist_hash ^= self.zobrist.turn_key(self._turn)
+        self.zobrist_hash ^= self.zobrist.turn_key(color)
+        self._turn = color
+
+    # Hash of the full game state from scratch, equal to the incremental zobrist_hash
+    def compute_zobrist_hash(self) -> int:
+        zobrist_hash = self.zobrist.turn_key(self._turn)
+        for color, player in self.players.items():
+            for token_index, token in enumerate(player.tokens):
+                zobrist_hash ^= self.zobrist.token_key(color, token_index, token)
+        return zobrist_hash
+
     def roll_dice(self):
-        return random.randint(1, 6)
+        return self.dice.roll(self.players[self.turn].starting_position)
 
     def next_turn(self):
         colors = list(self.players.keys())
@@ -120,34 +692,90 @@ class LudoGame:
         self.turn = colors[(current_index + 1) % len(self.players)]
 
     def move_token(self, player_color, token_index, dice_value):
+        # Only captures of played moves are profiled, not those of searches
+        undo_record = self.make_move(
+            player_color,
+            token_index,
+            dice_value,
+            time_capture=self.profiler is not None,
+        )
+        if self.tracer.enabled:
+            self.trace_move(undo_record)
+        return True
+
+    # Events of a move played in the game, moves made while searching are not traced
+    def trace_move(self, undo_record: "UndoRecord"):
+        color = undo_record.player_color
+        token_index = undo_record.token_index
+        token = self.players[color].tokens[token_index]
+        if token.position == -2:
+            kind = TraceEventKind.home
+            position = token.in_home_position
+            previous_position = undo_record.in_home_position
+        else:
+            kind = (
+                TraceEventKind.spawn
+                if undo_record.position == -1
+                else TraceEventKind.move
+            )
+            position = token.position
+            previous_position = undo_record.position
+        self.tracer.emit(
+            TraceEvent(
+                kind,
+                color,
+                token_index,
+                undo_record.dice_value,
+                position,
+                previous_position,
+            )
+        )
+
+        if undo_record.captured is not None:
+            self.tracer.emit(
+                TraceEvent(
+                    TraceEventKind.capture,
+                    color,
+                    token_index,
+                    undo_record.dice_value,
+                    token.position,
+                    other_color=undo_record.captured[0],
+                )
+            )
+
+    # Performs the move like move_token and returns what is needed to take it back
+    def make_move(
+        self, player_color, token_index, dice_value, time_capture=False
+    ) -> "UndoRecord":
         player = self.players[player_color]
         token = player.tokens[token_index]
         moved_squares = token.moved_squares
+        undo_record = UndoRecord(player_color, token_index, dice_value, token)
+        token_key = self.zobrist.token_key(player_color, token_index, token)
         candidate_home_position = moved_squares + dice_value - self.BOARD_LENGTH
 
         # Check if spawning is possible and legal (no own token is on the starting position)
         if (
             dice_value == 6
             and token.position == -1
-            and not any(t.position == player.starting_position for t in player.tokens)
+            and not self.occupancy.has_own_token(player_color, player.starting_position)
         ):
             token.position = player.starting_position
             self.players[player_color].stats.spawns += 1
-            log(f"{player_color} spawned a token at position {token.position}")
 
         # Normal move on board
         elif token.position >= 0 and moved_squares + dice_value < self.BOARD_LENGTH:
             candidate_position = (token.position + dice_value) % self.BOARD_LENGTH
             # Check if there's a token of the same color on the potential new position
-            if any(t.position == candidate_position for t in player.tokens):
+            if self.occupancy.has_own_token(player_color, candidate_position):
                 raise IllegalMoveError(
                     f"Illegal move! {player_color} already has a token at position {candidate_position}."
                 )
                 return False
 
+            self.occupancy.remove(player_color, token.position)
             token.position = candidate_position
             token.moved_squares += dice_value
-            log(f"{player_color} moved a token to position {token.position}")
 
         # Move into/within home
         elif (
@@ -155,34 +783,27 @@ class LudoGame:
             and moved_squares + dice_value >= self.BOARD_LENGTH
             and candidate_home_position <= self.HOME_LENGTH
         ):
-            occupied_home_positions_ahead = [
-                t.in_home_position
-                for t in player.tokens
-                if t.in_home_position > token.in_home_position and t != token
-            ]
-
             # Prevent moving token if there's a token of the same color on the potential new position
-            if candidate_home_position in occupied_home_positions_ahead:
+            if self.occupancy.is_home_slot_taken(player_color, candidate_home_position):
                 raise IllegalMoveError(
                     f"Illegal move! {player_color} cannot move to home position {candidate_home_position} as it's occupied."
                 )
                 return False
 
             # Prevent skipping over tokens in home
-            if any(
-                occupied_position < candidate_home_position
-                for occupied_position in occupied_home_positions_ahead
+            if not self.occupancy.home_path_clear(
+                player_color, token.in_home_position, candidate_home_position
             ):
                 raise IllegalMoveError(
                     f"Illegal move! {player_color} cannot skip over a token in home."
                 )
                 return False
 
-            if token.in_home_position == -1:
-                log(f"{player_color} moved a token into home.")
-            else:
-                log(f"{player_color} moved a token within home.")
-
+            if token.position >= 0:
+                self.occupancy.remove(player_color, token.position)
+            self.occupancy.move_in_home(
+                player_color, token.in_home_position, candidate_home_position
+            )
             token.position = -2
             token.moved_squares += dice_value
             token.in_home_position = candidate_home_position
@@ -192,30 +813,102 @@ class LudoGame:
             raise IllegalMoveError(f"Illegal move attempted by {player_color}.")
             return False
 
-        # Handle capturing tokens
+        # Handle capturing tokens, the occupant can only be an opponent token
         if token.position >= 0:
-            for other_color, other_player in self.players.items():
-                if other_color != player_color:
-                    for other_token in other_player.tokens:
-                        if other_token.position == token.position:
-                            other_token.position = -1
-                            other_token.moved_squares = 0
-                            self.players[player_color].stats.tokens_captured += 1
-                            other_player.stats.tokens_beaten += 1
-                            log(
-                                f"{player_color}'s token captured {other_color}'s token!"
-                            )
+            occupant = self.occupancy.occupant(token.position)
+            if occupant is not None:
+                if time_capture:
+                    capture_start = time.perf_counter()
+                other_color, other_token_index = occupant
+                other_player = self.players[other_color]
+                other_token = other_player.tokens[other_token_index]
+                undo_record.captured = (
+                    other_color,
+                    other_token_index,
+                    other_token.position,
+                    other_token.moved_squares,
+                )
+                self.occupancy.remove(other_color, other_token.position)
+                self.zobrist_hash ^= self.zobrist.token_key(
+                    other_color, other_token_index, other_token
+                )
+                other_token.position = -1
+                other_token.moved_squares = 0
+                self.zobrist_hash ^= self.zobrist.token_key(
+                    other_color, other_token_index, other_token
+                )
+                self.players[player_color].stats.tokens_captured += 1
+                other_player.stats.tokens_beaten += 1
+                if time_capture:
+                    self.profiler.add("capture", time.perf_counter() - capture_start)
+            self.occupancy.place(player_color, token_index, token.position)
+        self.zobrist_hash ^= token_key ^ self.zobrist.token_key(
+            player_color, token_index, token
+        )
 
         # Logging of stats
         self.players[player_color].stats.turns_taken += 1
         self.players[player_color].stats.total_squares_moved += dice_value
 
-        return True
+        return undo_record
+
+    # Restores the state from before make_move, moves must be undone in reverse order
+    def unmake_move(self, undo_record: "UndoRecord"):
+        player_color = undo_record.player_color
+        player = self.players[player_color]
+        token = player.tokens[undo_record.token_index]
+        self.zobrist_hash ^= self.zobrist.token_key(
+            player_color, undo_record.token_index, token
+        )
+
+        if token.position >= 0:
+            self.occupancy.remove(player_color, token.position)
+        else:
+            self.occupancy.leave_home(player_color, token.in_home_position)
+            if undo_record.in_home_position >= 0:
+                self.occupancy.move_in_home(
+                    player_color, -1, undo_record.in_home_position
+                )
+
+        token.position = undo_record.position
+        token.moved_squares = undo_record.moved_squares
+        token.in_home_position = undo_record.in_home_position
+        self.zobrist_hash ^= self.zobrist.token_key(
+            player_color, undo_record.token_index, token
+        )
+        if token.position >= 0:
+            self.occupancy.place(player_color, undo_record.token_index, token.position)
+        elif token.position == -1:
+            player.stats.spawns -= 1
+
+        if undo_record.captured is not None:
+            other_color, other_token_index, position, moved_squares = (
+                undo_record.captured
+            )
+            other_player = self.players[other_color]
+            other_token = other_player.tokens[other_token_index]
+            self.zobrist_hash ^= self.zobrist.token_key(
+                other_color, other_token_index, other_token
+            )
+            other_token.position = position
+            other_token.moved_squares = moved_squares
+            self.zobrist_hash ^= self.zobrist.token_key(
+                other_color, other_token_index, other_token
+            )
+            self.occupancy.place(other_color, other_token_index, position)
+            player.stats.tokens_captured -= 1
+            other_player.stats.tokens_beaten -= 1
+
+        player.stats.turns_taken -= 1
+        player.stats.total_squares_moved -= undo_record.dice_value
 
     def get_legal_moves(self, player_color, dice_value) -> list[tuple[int, Moves]]:
         player = self.players[player_color]
         legal_moves: list[tuple[int, Moves]] = []
         spawn_found = False
+        starting_position_blocked = self.occupancy.has_own_token(
+            player_color, player.starting_position
+        )
 
         # Perform similar checks as in move_token to get legal moves
         for idx, token in enumerate(player.tokens):
@@ -227,9 +920,7 @@ class LudoGame:
             if (
                 dice_value == 6
                 and token.position == -1
-                and not any(
-                    t.position == player.starting_position for t in player.tokens
-                )
+                and not starting_position_blocked
             ):
                 legal_moves.append((idx, Moves.spawn))
                 spawn_found = True
@@ -239,19 +930,11 @@ class LudoGame:
             elif (
                 token.position >= 0
                 and moved_squares + dice_value < self.BOARD_LENGTH
-                and not any(t.position == candidate_position for t in player.tokens)
+                and not self.occupancy.has_own_token(player_color, candidate_position)
             ):
-                capturing = False
-                for other_color, other_player in self.players.items():
-                    if other_color != player_color:
-                        for other_token in other_player.tokens:
-                            if other_token.position == candidate_position:
-                                legal_moves.append(
-                                    (idx, Moves.capture_move, candidate_position)
-                                )
-                                capturing = True
-
-                if not capturing:
+                if self.occupancy.is_occupied(candidate_position):
+                    legal_moves.append((idx, Moves.capture_move, candidate_position))
+                else:
                     legal_moves.append(
                         (idx, Moves.move_to_position, candidate_position)
                     )
@@ -262,18 +945,8 @@ class LudoGame:
                 and moved_squares + dice_value >= self.BOARD_LENGTH
                 and candidate_home_position <= self.HOME_LENGTH
             ):
-                occupied_home_positions_ahead = [
-                    t.in_home_position
-                    for t in player.tokens
-                    if t.in_home_position > token.in_home_position and t != token
-                ]
-
-                if (
-                    candidate_home_position not in occupied_home_positions_ahead
-                    and not any(
-                        occupied_position < candidate_home_position
-                        for occupied_position in occupied_home_positions_ahead
-                    )
+                if self.occupancy.home_path_clear(
+                    player_color, token.in_home_position, candidate_home_position
                 ):
                     if token.in_home_position >= 0:
                         legal_moves.append((idx, Moves.move_inside_home))
@@ -342,12 +1015,26 @@ class LudoGame:
         def game_over():
             return any(player.has_won() for player in self.players.values())
 
+        roll_dice = self.roll_dice
+        get_legal_moves = self.get_legal_moves
+        move_token = self.move_token
+        select_moves = {
+            color: player.strategy.select_move for color, player in self.players.items()
+        }
+        if self.profiler is not None:
+            game_over = self.profiler.timed("game_over", game_over)
+            roll_dice = self.profiler.timed("roll_dice", roll_dice)
+            get_legal_moves = self.profiler.timed("get_legal_moves", get_legal_moves)
+            move_token = self.profiler.timed("move_token", move_token)
+            for color, player in self.players.items():
+                select_moves[color] = self.profiler.timed(
+                    f"select_move[{player.strategy.name}]", select_moves[color]
+                )
+
         # Get move for current player
         def get_player_move(player_color, dice_roll):
-            player = self.players[player_color]
-
-            legal_moves = self.get_legal_moves(player_color, dice_roll)
-            selected_move = player.strategy.select_move(
+            legal_moves = get_legal_moves(player_color, dice_roll)
+            selected_move = select_moves[player_color](
                 legal_moves, dice_roll, player_color, self.players.values()
             )
 
@@ -362,9 +1049,13 @@ class LudoGame:
 
         # Main game loop
         while not game_over():
-            log(f"==> {self.turn}'s turn.")
-            dice_roll = self.roll_dice()
-            log(f"{self.turn} rolled a {dice_roll}")
+            if ENABLE_CONSOLE:
+                log(f"==> {self.turn}'s turn.")
+            dice_roll = roll_dice()
+            if self.tracer.enabled:
+                self.tracer.emit(
+                    TraceEvent(TraceEventKind.roll, self.turn, dice_value=dice_roll)
+                )
 
             # Debugging
             # if self.turn != "green":
@@ -373,96 +1064,314 @@ class LudoGame:
 
             if not any(token.position >= 0 for token in self.players[self.turn].tokens):
                 if dice_roll != 6:
-                    dice_roll = self.roll_dice()
-                    log(f"{self.turn} rolled a {dice_roll}")
+                    dice_roll = roll_dice()
+                    if self.tracer.enabled:
+                        self.tracer.emit(
+                            TraceEvent(
+                                TraceEventKind.roll, self.turn, dice_value=dice_roll
+                            )
+                        )
                     if dice_roll != 6:
-                        dice_roll = self.roll_dice()
-                        log(f"{self.turn} rolled a {dice_roll}")
+                        dice_roll = roll_dice()
+                        if self.tracer.enabled:
+                            self.tracer.emit(
+                                TraceEvent(
+                                    TraceEventKind.roll, self.turn, dice_value=dice_roll
+                                )
+                            )
 
             move = get_player_move(self.turn, dice_roll)
 
             if move:
-                successful_move = self.move_token(self.turn, move[0], dice_roll)
+                successful_move = move_token(self.turn, move[0], dice_roll)
                 self.display_board()
 
                 if game_over():
                     self.players[self.turn].stats.game_won = True
-                    log(f"Game over! {self.turn} wins!")
+                    if self.tracer.enabled:
+                        self.tracer.emit(TraceEvent(TraceEventKind.win, self.turn))
                     break
 
                 # Player gets another turn if they roll a six and make a legal move
                 if dice_roll != 6 or not successful_move:
                     self.next_turn()
             else:
-                log(f"No legal moves for {self.turn}, next player's turn.")
+                if ENABLE_CONSOLE:
+                    log(f"No legal moves for {self.turn}, next player's turn.")
                 self.display_board()
                 self.next_turn()
 
             self.clearAndWaitForEnter()
 
     def reset_game(self):
+        self.occupancy.reset()
         for player in self.players.values():
             for token in player.tokens:
                 token.position = -1  # Reset position to not on the board
                 token.moved_squares = 0
                 token.in_home_position = -1  # Reset home position status
             player.stats.reset()  # Reset the stats for the player
+        self.zobrist_hash = self.compute_zobrist_hash()
+
+    # Positions of all tokens and the player to move, the stats are not included
+    def get_state(self) -> tuple:
+        return (
+            self.turn,
+            tuple(
+                tuple(
+                    (token.position, token.moved_squares, token.in_home_position)
+                    for token in player.tokens
+                )
+                for player in self.players.values()
+            ),
+        )
 
-    def simulate_games(self, number_of_games):
-        # Initialize batch stats with empty stats, not from player objects
-        batch_stats = {
-            "games_played": number_of_games,
-            "players": {
-                color: {
-                    "strategy": type(player.strategy).__name__,
-                    "turns_taken": [],
-                    "tokens_captured": [],
-                    "tokens_beaten": [],
-                    "spawns": [],
-                    "total_squares_moved": [],
-                    "games_won": [],
-                    "turns_until_win": [],
-                }
-                for color, player in self.players.items()
-            },
+    def set_state(self, state: tuple):
+        turn, player_tokens = state
+        self.occupancy.reset()
+        for (color, player), tokens in zip(self.players.items(), player_tokens):
+            for token_index, (token, token_state) in enumerate(
+                zip(player.tokens, tokens)
+            ):
+                token.position, token.moved_squares, token.in_home_position = (
+                    token_state
+                )
+                if token.position >= 0:
+                    self.occupancy.place(color, token_index, token.position)
+                elif token.position == -2:
+                    self.occupancy.move_in_home(color, -1, token.in_home_position)
+        self._turn = turn
+        self.zobrist_hash = self.compute_zobrist_hash()
+
+    # Plays a game again from the dice rolls recorded by a DiceStream with
+    # record=True, strategies that draw random numbers have to be seeded alike.
+    # The stream continues where it was before the replay afterwards
+    def replay_game(self, rolls: list[int], starting_player: str):
+        dice = self.dice
+        stream_state = (dice.buffer, dice.index, dice.replaying, dice.rolls)
+        try:
+            self.reset_game()
+            dice.replay(rolls)
+            self.turn = starting_player
+            self.play_game()
+        finally:
+            dice.buffer, dice.index, dice.replaying, dice.rolls = stream_state
+        return self.game_record()
+
+    def choose_starting_player(self):
+        if self.starting_player == "random":
+            self.turn = random.choice(list(self.players.keys()))
+        else:
+            self.turn = self.starting_player
+
+    # Stats of every player in the game just played, in the order of RESULT_FIELDS
+    def game_record(self) -> dict[str, list]:
+        return {
+            color: [
+                player.stats.turns_taken,
+                player.stats.tokens_captured,
+                player.stats.tokens_beaten,
+                player.stats.spawns,
+                player.stats.total_squares_moved,
+                player.has_won(),
+            ]
+            for color, player in self.players.items()
         }
 
-        for game_number in range(number_of_games):
+    def simulate_game_range(self, first_game, last_game, seed):
+        for player in self.players.values():
+            player.strategy.reset_report()
+        if self.profiler is not None:
+            self.profiler.reset()
+
+        games = []
+        for game_number in range(first_game, last_game):
             print(f"Starting game {game_number + 1}...")
+            # Every game gets its own seed, so the result of a game does not
+            # depend on which worker played it or what was played before it
+            random.seed(f"{seed}:{game_number}")
+            self.dice.reseed([seed, game_number])
             self.reset_game()
+            self.choose_starting_player()
             self.play_game()
+            games.append(self.game_record())
 
-            # Append the stats from this game to the lists
-            for color, player in self.players.items():
-                batch_player_data = batch_stats["players"][color]
-                batch_player_data["turns_taken"].append(player.stats.turns_taken)
-                batch_player_data["tokens_captured"].append(
-                    player.stats.tokens_captured
+        reports = {}
+        for color, player in self.players.items():
+            report = player.strategy.report()
+            if report is not None:
+                reports[color] = report
+
+        profile = self.profiler.snapshot() if self.profiler is not None else None
+        return games, reports, profile
+
+    def simulate_games(
+        self,
+        number_of_games,
+        workers: int = 1,
+        seed: int | None = None,
+        sink: "ResultSink | None" = None,
+        confidence: float | None = None,
+    ):
+        if seed is None:
+            seed = random.randrange(2**32)
+        if sink is None:
+            sink = JsonSink()
+        sink.open(
+            {
+                "games_played": number_of_games,
+                "seed": seed,
+                "strategies": {
+                    color: player.strategy.name
+                    for color, player in self.players.items()
+                },
+            }
+        )
+
+        # Games are played and written in chunks, so memory use does not grow
+        # with the number of games
+        test_interval = max(1, sink.chunk_size)
+        chunk_size = test_interval
+        if workers > 1:
+            # Several chunks per worker so that a worker stuck with long games
+            # does not leave the others idle at the end of the run
+            chunk_size = min(chunk_size, math.ceil(number_of_games / (workers * 4)))
+        chunk_size = max(1, chunk_size)
+        # Chunks never cross a multiple of the test interval, so the sequential
+        # test below sees the same games for any number of workers
+        first_games = [
+            first_game
+            for first_interval_game in range(0, number_of_games, test_interval)
+            for first_game in range(
+                first_interval_game,
+                min(first_interval_game + test_interval, number_of_games),
+                chunk_size,
+            )
+        ]
+        last_games = [
+            min(
+                first_game + chunk_size,
+                (first_game // test_interval + 1) * test_interval,
+                number_of_games,
+            )
+            for first_game in first_games
+        ]
+        seeds = [seed] * len(last_games)
+        # With a confidence, number_of_games is the budget and the run stops as
+        # soon as the win rates of the players are ranked at that confidence,
+        # tested every test_interval games
+        sequential_test = (
+            SequentialTest(
+                confidence, checks=math.ceil(number_of_games / test_interval)
+            )
+            if confidence
+            else None
+        )
+
+        reports: dict[str, dict] = {}
+        # Profile of the whole run, merged from the profiles of the chunks
+        profiler = Profiler() if self.profiler is not None else None
+        if workers > 1:
+            # Imported here, serial runs and importing the engine skip its cost
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self,)
+            ) as executor:
+                # Chunks are yielded in submission order, which keeps the games
+                # in order regardless of the worker count
+                chunk_results = _ordered_map(
+                    executor,
+                    _simulate_chunk,
+                    zip(first_games, last_games, seeds),
+                    window=workers * 2,
                 )
-                batch_player_data["tokens_beaten"].append(player.stats.tokens_beaten)
-                batch_player_data["spawns"].append(player.stats.spawns)
-                batch_player_data["total_squares_moved"].append(
-                    player.stats.total_squares_moved
+                games_played = self.write_chunks(
+                    sink,
+                    chunk_results,
+                    reports,
+                    profiler,
+                    sequential_test,
+                    test_interval,
                 )
-                batch_player_data["games_won"].append(player.has_won())
-                if player.has_won():
-                    batch_player_data["turns_until_win"].append(
-                        player.stats.turns_taken
-                    )
-                else:
-                    batch_player_data["turns_until_win"].append(False)
+                # Chunks that were not started yet are not needed after an early stop
+                executor.shutdown(cancel_futures=True)
+        else:
+            chunk_results = map(
+                self.simulate_game_range, first_games, last_games, seeds
+            )
+            games_played = self.write_chunks(
+                sink, chunk_results, reports, profiler, sequential_test, test_interval
+            )
 
-        # Save the batch statistics
-        self.save_batch_game_log(batch_stats)
+        for color, report in reports.items():
+            strategy = self.players[color].strategy
+            report.update(strategy.summarize_report(report))
+            print(f"{color} {strategy.name}: {report}")
+
+        summary = {"games_played": games_played, "strategy_reports": reports}
+        if profiler is not None:
+            print(profiler.summary_table())
+            summary["profile"] = profiler.report()
+        if sequential_test is not None:
+            summary["sequential_test"] = sequential_test.report()
+            settled = "settled" if sequential_test.settled() else "not settled"
+            print(f"Ranking {settled} after {games_played} of {number_of_games} games:")
+            for color, (low, high) in sequential_test.intervals().items():
+                print(
+                    f"{color} {self.players[color].strategy.name}: "
+                    f"{sequential_test.win_rate(color):.3f} [{low:.3f}, {high:.3f}]"
+                )
+        sink.close(summary)
+        return summary
 
-    def save_batch_game_log(self, batch_stats):
-        # Serialize to JSON and save to a file
-        with open("batch_game_log.json", "w") as log_file:
-            json.dump(batch_stats, log_file, indent=4)
+    @staticmethod
+    def write_chunks(
+        sink: "ResultSink",
+        chunk_results,
+        reports: dict[str, dict],
+        profiler: "Profiler | None" = None,
+        sequential_test: "SequentialTest | None" = None,
+        test_interval: int = 1,
+    ) -> int:
+        # Returns the number of games written, chunks after the one that
+        # settled the sequential test are not written. The test runs whenever
+        # the games written reach a multiple of test_interval
+        games_played = 0
+        for games, chunk_reports, chunk_profile in chunk_results:
+            sink.write(games)
+            games_played += len(games)
+            if profiler is not None:
+                profiler.merge(chunk_profile)
+            for color, chunk_report in chunk_reports.items():
+                report = reports.setdefault(color, {})
+                for counter, value in chunk_report.items():
+                    report[counter] = report.get(counter, 0) + value
+
+            if sequential_test is not None:
+                for color in games[0]:
+                    wins = sum(game[color][-1] for game in games)
+                    sequential_test.add(color, len(games), wins)
+                if games_played % test_interval == 0 and sequential_test.settled():
+                    break
+        return games_played
 
 
 ## Strategies
 class MoveStrategy:
+    # Set by LudoGame for strategies that search on the game
+    game: "LudoGame | None" = None
+    # True if select_move only depends on the board, dice roll and color
+    deterministic = False
+    # Risk of standing on an opponent's spawn point, and how many squares
+    # ahead of them opponent tokens threaten, see calculate_risk
+    spawn_risk = 3
+    risk_range = 6
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
     def select_move(
         self,
         legal_moves: list[tuple[int, Moves]],
@@ -472,6 +1381,28 @@ class MoveStrategy:
     ) -> Moves:
         raise NotImplementedError("This method should be overridden by subclasses")
 
+    # Part of the state select_move depends on, used as key by CachedStrategy,
+    # None if the decision depends on the full game state
+    def decision_key(
+        self,
+        legal_moves: list[tuple[int, Moves]],
+        dice_roll: int,
+        player_color: str,
+        all_players: list[Player],
+    ) -> tuple | None:
+        return None
+
+    # Counters collected during simulate_games, summed over all workers
+    def report(self) -> dict | None:
+        return None
+
+    def reset_report(self):
+        pass
+
+    # Values derived from the summed counters, like rates
+    def summarize_report(self, report: dict) -> dict:
+        return {}
+
     def find_move(
         self, target: Moves, moves: list[tuple[int, Moves]]
     ) -> tuple[int, Moves] | None:
@@ -487,7 +1418,7 @@ class MoveStrategy:
             for opponent in opponents:
                 # Increase risk if we are on the spawn point of an opponent
                 if opponent.starting_position == player_token.position:
-                    risk_level += 3
+                    risk_level += self.spawn_risk
                 for opp_token in opponent.tokens:
                     if opp_token.position >= 0:
                         opponent_distance_to_home = (
@@ -502,13 +1433,45 @@ class MoveStrategy:
                         # Check if opponents home is between the enemies token and our token
                         if opponent_distance_to_home < distance_to_token:
                             continue
-                        # A token is at risk if an opponent token is within 6 steps behind it
-                        if 0 < distance_to_token <= 6:
+                        # A token is at risk if an opponent token is within
+                        # risk_range steps behind it
+                        if 0 < distance_to_token <= self.risk_range:
                             risk_level += 1
         return risk_level
 
+    # Risk level of every board square, equal to calculate_risk for a token on it
+    def calculate_threat_map(self, opponents: list[Player]) -> list[int]:
+        threat_map = [0] * LudoGame.BOARD_LENGTH
+
+        for opponent in opponents:
+            # Increase risk on the spawn point of an opponent
+            threat_map[opponent.starting_position] += self.spawn_risk
+            for opp_token in opponent.tokens:
+                if opp_token.position >= 0:
+                    opponent_distance_to_home = (
+                        opponent.starting_position - opp_token.position
+                    ) % LudoGame.BOARD_LENGTH
+                    # WORKAROUND: starting position modulo
+                    if opponent_distance_to_home == 0:
+                        opponent_distance_to_home = 40
+                    # Squares within risk_range steps ahead are at risk, unless
+                    # the opponent's home is in between
+                    for distance in range(
+                        1, min(self.risk_range, opponent_distance_to_home) + 1
+                    ):
+                        threat_map[
+                            (opp_token.position + distance) % LudoGame.BOARD_LENGTH
+                        ] += 1
+        return threat_map
+
 
 class SpeedrunStrategy(MoveStrategy):
+    deterministic = True
+
+    def decision_key(self, legal_moves, dice_roll, player_color, all_players):
+        player = next(player for player in all_players if player.color == player_color)
+        return tuple(legal_moves), tuple(t.moved_squares for t in player.tokens)
+
     def select_move(
         self,
         legal_moves: list[tuple[int, Moves]],
@@ -532,6 +1495,29 @@ class SpeedrunStrategy(MoveStrategy):
 
 
 class AggressiveStrategy(MoveStrategy):
+    deterministic = True
+
+    def __init__(self, approach_weight: float = 10, retreat_penalty: float = 10):
+        # Weight of an opponent token in reach, divided by the turns needed
+        # to reach it, and penalty for every token that goes out of reach
+        self.approach_weight = approach_weight
+        self.retreat_penalty = retreat_penalty
+
+    def decision_key(self, legal_moves, dice_roll, player_color, all_players):
+        return (
+            tuple(legal_moves),
+            dice_roll,
+            tuple(
+                (
+                    (t.position, t.moved_squares)
+                    if player.color == player_color
+                    else t.position
+                )
+                for player in all_players
+                for t in player.tokens
+            ),
+        )
+
     def select_move(
         self,
         legal_moves: list[tuple[int, Moves]],
@@ -558,14 +1544,16 @@ class AggressiveStrategy(MoveStrategy):
             if move[1] == Moves.move_to_position:
                 self_token = self_player.tokens[move[0]]
 
+                position_after_turn = self_token.position + dice_roll
+                moved_squares_after_turn = self_token.moved_squares + dice_roll
+
                 distances_to_enemy: list[int] = []
                 for player in other_players:
                     for other_token in player.tokens:
-                        temp_token_after_turn = deepcopy(self_token)
-                        temp_token_after_turn.position += dice_roll
-                        temp_token_after_turn.moved_squares += dice_roll
-                        distance = LudoGame.get_reachable_distance_between(
-                            temp_token_after_turn, other_token
+                        distance = LudoGame.get_reachable_distance(
+                            position_after_turn,
+                            moved_squares_after_turn,
+                            other_token.position,
                         )
                         if distance == -2:  # token2 not on board
                             continue
@@ -584,21 +1572,22 @@ class AggressiveStrategy(MoveStrategy):
                 move_weights[move] = 0
                 for distance in distances_to_enemy:
                     if distance == -1:  # went out of reach
-                        move_weights[move] -= 10
+                        move_weights[move] -= self.retreat_penalty
                     else:
                         min_turn_amount = math.ceil(distance / 6)
-                        move_weights[move] += 10 / min_turn_amount
+                        move_weights[move] += self.approach_weight / min_turn_amount
                 if distances_to_enemy:
                     move_weights[move] /= len(distances_to_enemy)
 
         if move_weights:
-            log("Aggressive move weights:")
-            log(
-                [
-                    f"{move[1].name}[{move[0]}]: {weight}"
-                    for (move, weight) in move_weights.items()
-                ]
-            )
+            if ENABLE_CONSOLE:
+                log("Aggressive move weights:")
+                log(
+                    [
+                        f"{move[1].name}[{move[0]}]: {weight}"
+                        for (move, weight) in move_weights.items()
+                    ]
+                )
             most_aggressive_move = max(
                 move_weights, key=move_weights.get
             )  # the move with max weight
@@ -614,6 +1603,12 @@ class AggressiveStrategy(MoveStrategy):
 
 
 class DefensiveStrategy(MoveStrategy):
+    deterministic = True
+
+    def decision_key(self, legal_moves, dice_roll, player_color, all_players):
+        player = next(player for player in all_players if player.color == player_color)
+        return tuple(legal_moves), tuple(t.moved_squares for t in player.tokens)
+
     def select_move(
         self,
         legal_moves: list[tuple[int, Moves]],
@@ -654,6 +1649,40 @@ class DefensiveStrategy(MoveStrategy):
 
 
 class SmartStrategy(MoveStrategy):
+    deterministic = True
+
+    def __init__(
+        self,
+        spawn_risk: int = MoveStrategy.spawn_risk,
+        risk_range: int = MoveStrategy.risk_range,
+        progress_divisor: float = LudoGame.BOARD_LENGTH * 10,
+    ):
+        # Risk levels are counts and risk_range a number of squares, so both
+        # have to be whole numbers
+        for name, value in (("spawn_risk", spawn_risk), ("risk_range", risk_range)):
+            if value != int(value):
+                raise ValueError(f"{name} has to be a whole number, not {value}.")
+        self.spawn_risk = int(spawn_risk)
+        self.risk_range = int(risk_range)
+        # Moved squares are divided by it to break ties in favor of the
+        # token furthest ahead, larger values weigh the progress less
+        self.progress_divisor = progress_divisor
+
+    def decision_key(self, legal_moves, dice_roll, player_color, all_players):
+        return (
+            tuple(legal_moves),
+            dice_roll,
+            tuple(
+                (
+                    (t.position, t.moved_squares)
+                    if player.color == player_color
+                    else t.position
+                )
+                for player in all_players
+                for t in player.tokens
+            ),
+        )
+
     def select_move(
         self,
         legal_moves: list[tuple[int, Moves]],
@@ -666,13 +1695,16 @@ class SmartStrategy(MoveStrategy):
         )
         opponents = [player for player in all_players if player.color != player_color]
 
-        # Assess the current risk for each token
+        # Assess the current risk for each token, only tokens on the board are at risk
+        threat_map = self.calculate_threat_map(opponents)
         current_risks = [
-            self.calculate_risk(token, opponents) for token in current_player.tokens
+            threat_map[token.position] if token.position >= 0 else 0
+            for token in current_player.tokens
         ]
 
-        log(f"RISKS: {current_risks}")
-        log(f"MOVES: {legal_moves}")
+        if ENABLE_CONSOLE:
+            log(f"RISKS: {current_risks}")
+            log(f"MOVES: {legal_moves}")
 
         best_move = None
         best_risk_reduction = 0
@@ -685,20 +1717,16 @@ class SmartStrategy(MoveStrategy):
                 if move[1] == Moves.move_to_position or move[1] == Moves.capture_move
                 else -2
             )
-            # Make a hypothetical token for risk assessment
-            hypo_token = Token(token.color)
-            hypo_token.position = new_position
-
             # Calculate the risk after the move
-            new_risk = self.calculate_risk(hypo_token, opponents)
+            new_risk = threat_map[new_position] if new_position >= 0 else 0
 
             risk_reduction = current_risks[move[0]] - new_risk
 
             # Weight based on how far the token is
             if risk_reduction >= 0:
-                risk_reduction += token.moved_squares / (LudoGame.BOARD_LENGTH * 10)
+                risk_reduction += token.moved_squares / self.progress_divisor
             else:
-                risk_reduction -= token.moved_squares / (LudoGame.BOARD_LENGTH * 10)
+                risk_reduction -= token.moved_squares / self.progress_divisor
 
             # If the move reduces risk and is better than previous best, select it
             if risk_reduction > best_risk_reduction:
@@ -751,6 +1779,491 @@ class RandomStrategy(MoveStrategy):
             return None
 
 
+class ExpectimaxStrategy(MoveStrategy):
+    WIN_VALUE = 1000
+    HOME_BONUS = 10
+
+    def __init__(
+        self,
+        depth: int = 2,
+        node_budget: int = 200,
+        time_budget: float | None = None,
+        table_size: int = 100_000,
+        risk_weight: float = 1.0,
+    ):
+        self.depth = depth  # Number of moves searched, including our own
+        self.node_budget = node_budget  # Moves explored per decision
+        self.time_budget = time_budget  # Seconds per decision
+        self.risk_weight = risk_weight  # Weight of the expected loss to captures
+        self.transposition_table = LRUCache(table_size)
+        self.reset_report()
+
+    def reset_report(self):
+        self.decisions = 0
+        self.nodes = 0
+        self.search_time = 0.0
+        self.budget_exhausted = 0
+        self.depth_reached = 0
+        self.transposition_table.hits = 0
+        self.transposition_table.misses = 0
+
+    def report(self) -> dict:
+        return {
+            "decisions": self.decisions,
+            "nodes": self.nodes,
+            "search_time": self.search_time,
+            "budget_exhausted": self.budget_exhausted,
+            "depth_reached": self.depth_reached,
+            "table_hits": self.transposition_table.hits,
+            "table_lookups": self.transposition_table.hits
+            + self.transposition_table.misses,
+        }
+
+    def summarize_report(self, report: dict) -> dict:
+        return {
+            "node_budget": self.node_budget,
+            "nodes_per_decision": report["nodes"] / max(report["decisions"], 1),
+            "mean_depth": report["depth_reached"] / max(report["decisions"], 1),
+            "nodes_per_second": report["nodes"] / max(report["search_time"], 1e-9),
+            "table_hit_rate": report["table_hits"] / max(report["table_lookups"], 1),
+        }
+
+    def select_move(
+        self,
+        legal_moves: list[tuple[int, Moves]],
+        dice_roll: int,
+        player_color: str,
+        all_players: list[Player],
+    ):
+        if len(legal_moves) <= 1:
+            return legal_moves[0] if legal_moves else None
+        if self.game is None:
+            raise RuntimeError("ExpectimaxStrategy needs to be used within a LudoGame")
+
+        start_time = time.perf_counter()
+        self.deadline = (
+            start_time + self.time_budget if self.time_budget is not None else None
+        )
+        self.decision_nodes = 0
+
+        # Iterative deepening: every depth searches all moves, an iteration
+        # the budget runs out in is discarded, so the selected move is always
+        # the best one of a completed depth. Depth 1 never runs out
+        best_move = None
+        completed_depth = 0
+        for depth in range(1, self.depth + 1):
+            self.aborted = False
+            iteration_best_move = None
+            best_value = -math.inf
+            for move in legal_moves:
+                value = self.move_value(
+                    player_color, move, dice_roll, depth, player_color
+                )
+                if self.aborted:
+                    break
+                if value > best_value:
+                    iteration_best_move = move
+                    best_value = value
+            if self.aborted:
+                self.budget_exhausted += 1
+                break
+            best_move = iteration_best_move
+            completed_depth = depth
+
+        self.decisions += 1
+        self.depth_reached += completed_depth
+        self.nodes += self.decision_nodes
+        self.search_time += time.perf_counter() - start_time
+        return best_move
+
+    def budget_spent(self) -> bool:
+        return self.decision_nodes >= self.node_budget or (
+            self.deadline is not None and time.perf_counter() >= self.deadline
+        )
+
+    # Value of a move for the root player, opponents are assumed to play against them
+    def move_value(self, player_color, move, dice_roll, depth, root_color) -> float:
+        self.decision_nodes += 1
+        undo_record = self.game.make_move(player_color, move[0], dice_roll)
+
+        if self.game.players[player_color].has_won():
+            value = self.WIN_VALUE if player_color == root_color else -self.WIN_VALUE
+        elif depth <= 1:
+            value = self.evaluate(root_color)
+        elif self.budget_spent():
+            # The value is discarded with the rest of the iteration
+            self.aborted = True
+            value = 0.0
+        else:
+            # Player gets another turn if they roll a six
+            next_color = (
+                player_color if dice_roll == 6 else self.next_color(player_color)
+            )
+            value = self.chance_value(next_color, depth - 1, root_color)
+
+        self.game.unmake_move(undo_record)
+        return value
+
+    def chance_value(self, player_color, depth, root_color) -> float:
+        value = 0.0
+        for dice_roll, probability in self.dice_probabilities(player_color):
+            legal_moves = self.game.get_legal_moves(player_color, dice_roll)
+            if not legal_moves:
+                value += probability * self.evaluate(root_color)
+                continue
+            move_values = []
+            for move in legal_moves:
+                move_values.append(
+                    self.move_value(player_color, move, dice_roll, depth, root_color)
+                )
+                if self.aborted:
+                    return value
+            if player_color == root_color:
+                value += probability * max(move_values)
+            else:
+                value += probability * min(move_values)
+        return value
+
+    def dice_probabilities(self, player_color) -> list[tuple[int, float]]:
+        tokens = self.game.players[player_color].tokens
+        if any(token.position >= 0 for token in tokens):
+            return [(dice_roll, 1 / 6) for dice_roll in range(1, 7)]
+        # Without tokens on the board a player has three tries to roll a six
+        no_six = (5 / 6) ** 3
+        return [(dice_roll, no_six / 5) for dice_roll in range(1, 6)] + [
+            (6, 1 - no_six)
+        ]
+
+    def next_color(self, player_color) -> str:
+        colors = list(self.game.players.keys())
+        return colors[(colors.index(player_color) + 1) % len(colors)]
+
+    # Squares a token has moved, growing faster than linearly so that moving
+    # the tokens furthest ahead and capturing them counts more
+    def token_value(self, token) -> float:
+        value = token.moved_squares + token.moved_squares**2 / LudoGame.BOARD_LENGTH
+        return value + (self.HOME_BONUS if token.position == -2 else 0)
+
+    # Value of the tokens on threatened squares that is expected to be lost,
+    # the risk level of a square like in SmartStrategy with 6 as a sure capture
+    def expected_loss(self, players, threat_map) -> float:
+        return sum(
+            min(threat_map[token.position], 6) / 6 * self.token_value(token)
+            for player in players
+            for token in player.tokens
+            if token.position >= 0
+        )
+
+    # Value of the root player compared to the average opponent, both minus
+    # what they are expected to lose to captures. Whole subtrees rarely repeat
+    # within the searched depth, but leaves do, e.g. for every dice roll a
+    # player can not move with and across decisions, so the values of the
+    # leaves are kept in the transposition table. The key leaves out whose
+    # turn it is in the game, which the value does not depend on
+    def evaluate(self, root_color) -> float:
+        game = self.game
+        key = (game.zobrist_hash ^ game.zobrist.turn_key(game.turn), root_color)
+        value = self.transposition_table.get(key)
+        if value is None:
+            value = self.evaluate_position(root_color)
+            self.transposition_table.put(key, value)
+        return value
+
+    def evaluate_position(self, root_color) -> float:
+        root_player = self.game.players[root_color]
+        opponents = [
+            player for color, player in self.game.players.items() if color != root_color
+        ]
+        value = sum(self.token_value(token) for token in root_player.tokens)
+        opponent_value = sum(
+            self.token_value(token) for player in opponents for token in player.tokens
+        )
+        if self.risk_weight:
+            value -= self.risk_weight * self.expected_loss(
+                [root_player], self.calculate_threat_map(opponents)
+            )
+            opponent_value -= self.risk_weight * self.expected_loss(
+                opponents, self.calculate_threat_map([root_player])
+            )
+        return value - opponent_value / len(opponents)
+
+
+class CachedStrategy(MoveStrategy):
+    # Remembers the decisions of a deterministic strategy by game state
+    def __init__(self, strategy: MoveStrategy, max_size: int = 100_000):
+        if not strategy.deterministic:
+            raise ValueError(f"{strategy.name} is not deterministic.")
+        self.strategy = strategy
+        self.decisions = LRUCache(max_size)
+
+    @property
+    def name(self) -> str:
+        return self.strategy.name
+
+    @property
+    def game(self):
+        return self.strategy.game
+
+    @game.setter
+    def game(self, game):
+        self.strategy.game = game
+
+    def reset_report(self):
+        self.decisions.hits = 0
+        self.decisions.misses = 0
+
+    def report(self) -> dict:
+        return {
+            "cache_hits": self.decisions.hits,
+            "cache_misses": self.decisions.misses,
+        }
+
+    def summarize_report(self, report: dict) -> dict:
+        lookups = report["cache_hits"] + report["cache_misses"]
+        return {
+            "cache_size": self.decisions.max_size,
+            "cache_hit_rate": report["cache_hits"] / max(lookups, 1),
+        }
+
+    def state_key(self, legal_moves, dice_roll, player_color, all_players):
+        decision_key = self.strategy.decision_key(
+            legal_moves, dice_roll, player_color, all_players
+        )
+        if decision_key is not None:
+            return player_color, decision_key
+        if self.game is not None:
+            return player_color, dice_roll, self.game.zobrist_hash
+        return (
+            player_color,
+            dice_roll,
+            tuple(
+                (token.position, token.moved_squares, token.in_home_position)
+                for player in all_players
+                for token in player.tokens
+            ),
+        )
+
+    def select_move(
+        self,
+        legal_moves: list[tuple[int, Moves]],
+        dice_roll: int,
+        player_color: str,
+        all_players: list[Player],
+    ):
+        # Forced moves are cheaper to decide than to look up
+        if len(legal_moves) <= 1:
+            return self.strategy.select_move(
+                legal_moves, dice_roll, player_color, all_players
+            )
+
+        key = self.state_key(legal_moves, dice_roll, player_color, all_players)
+        # Moves can be None, so a missing entry is marked with the cache itself
+        move = self.decisions.get(key, self.decisions)
+        if move is self.decisions:
+            move = self.strategy.select_move(
+                legal_moves, dice_roll, player_color, all_players
+            )
+            self.decisions.put(key, move)
+        return move
+
+
+## Strategy names
+# Names of the strategies selectable from the command line
+STRATEGIES = {
+    "aggressive": AggressiveStrategy,
+    "defensive": DefensiveStrategy,
+    "smart": SmartStrategy,
+    "speedrun": SpeedrunStrategy,
+    "random": RandomStrategy,
+    "expectimax": ExpectimaxStrategy,
+}
+
+
+## Result sinks
+# simulate_games opens a sink with a header, writes the games chunk by chunk
+# and closes it with a summary
+class ResultSink:
+    chunk_size = 1000
+
+    def open(self, header: dict):
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+    def write(self, games: list[dict[str, list]]):
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+    def close(self, summary: dict):
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+
+class JsonSink(ResultSink):
+    # Collects all games in memory and writes them as one JSON file at the end
+    def __init__(self, path: str = "batch_game_log.json"):
+        self.path = path
+
+    def open(self, header: dict):
+        self.batch_stats = {
+            "games_played": header["games_played"],
+            "seed": header["seed"],
+            "players": {
+                color: {
+                    "strategy": strategy,
+                    "turns_taken": [],
+                    "tokens_captured": [],
+                    "tokens_beaten": [],
+                    "spawns": [],
+                    "total_squares_moved": [],
+                    "games_won": [],
+                    "turns_until_win": [],
+                }
+                for color, strategy in header["strategies"].items()
+            },
+        }
+
+    def write(self, games: list[dict[str, list]]):
+        for game in games:
+            for color, values in game.items():
+                batch_player_data = self.batch_stats["players"][color]
+                for field, value in zip(LudoGame.RESULT_FIELDS, values):
+                    batch_player_data[field].append(value)
+                if batch_player_data["games_won"][-1]:
+                    batch_player_data["turns_until_win"].append(
+                        batch_player_data["turns_taken"][-1]
+                    )
+                else:
+                    batch_player_data["turns_until_win"].append(False)
+
+    def close(self, summary: dict):
+        self.batch_stats["games_played"] = summary["games_played"]
+        for color, report in summary["strategy_reports"].items():
+            self.batch_stats["players"][color]["strategy_report"] = report
+        # Entries like the profile or the sequential test are stored as they are
+        for key, value in summary.items():
+            if key not in ("games_played", "strategy_reports"):
+                self.batch_stats[key] = value
+
+        # Serialize to JSON and save to a file
+        with open(self.path, "w") as log_file:
+            json.dump(self.batch_stats, log_file, indent=4)
+
+
+class JsonLinesSink(ResultSink):
+    # Appends one line per game, a crash loses at most the chunk being written,
+    # whose torn last line is skipped when the file is loaded
+    def __init__(self, path: str = "batch_game_log.jsonl", chunk_size: int = 1000):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def open(self, header: dict):
+        self.log_file = open(self.path, "w")
+        header = dict(header, fields=list(LudoGame.RESULT_FIELDS))
+        self.log_file.write(json.dumps({"header": header}) + "\n")
+
+    def write(self, games: list[dict[str, list]]):
+        self.log_file.write("".join(json.dumps(game) + "\n" for game in games))
+        self.log_file.flush()
+
+    def close(self, summary: dict):
+        self.log_file.write(json.dumps({"summary": summary}) + "\n")
+        self.log_file.close()
+
+
+class ColumnarSink(ResultSink):
+    # Writes a directory with a header.json and one fixed-width .npy column per
+    # color and field, which can be opened with np.load(mmap_mode="r")
+    COLUMN_DTYPES = {
+        "turns_taken": "<u2",
+        "tokens_captured": "<u2",
+        "tokens_beaten": "<u2",
+        "spawns": "<u2",
+        "total_squares_moved": "<u4",
+        "games_won": "|b1",
+    }
+
+    def __init__(self, path: str = "batch_game_log.columns", chunk_size: int = 10_000):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def open(self, header: dict):
+        # NumPy is only needed for this format
+        from numpy.lib.format import open_memmap
+
+        os.makedirs(self.path, exist_ok=True)
+        self.header = dict(
+            header,
+            games_played=0,
+            capacity=header["games_played"],
+            fields=self.COLUMN_DTYPES,
+        )
+        self.columns = {
+            color: {
+                field: open_memmap(
+                    os.path.join(self.path, f"{color}.{field}.npy"),
+                    mode="w+",
+                    dtype=dtype,
+                    shape=(header["games_played"],),
+                )
+                for field, dtype in self.COLUMN_DTYPES.items()
+            }
+            for color in header["strategies"]
+        }
+        self.write_header()
+
+    def write(self, games: list[dict[str, list]]):
+        first_game = self.header["games_played"]
+        last_game = first_game + len(games)
+        for color, columns in self.columns.items():
+            for field_index, column in enumerate(columns.values()):
+                column[first_game:last_game] = [
+                    game[color][field_index] for game in games
+                ]
+                column.flush()
+        # The header only counts games that are already on disk
+        self.header["games_played"] = last_game
+        self.write_header()
+
+    def close(self, summary: dict):
+        self.header["strategy_reports"] = summary["strategy_reports"]
+        for key, value in summary.items():
+            if key not in ("games_played", "strategy_reports"):
+                self.header[key] = value
+        self.write_header()
+        del self.columns
+
+    def write_header(self):
+        header_path = os.path.join(self.path, "header.json")
+        with open(header_path + ".tmp", "w") as header_file:
+            json.dump(self.header, header_file, indent=4)
+        os.replace(header_path + ".tmp", header_path)
+
+
+RESULT_SINKS = {"json": JsonSink, "jsonl": JsonLinesSink, "columnar": ColumnarSink}
+
+
+## Parallel simulation workers
+_worker_game: LudoGame | None = None
+
+
+def _init_worker(game):
+    global _worker_game
+    _worker_game = game
+
+
+def _simulate_chunk(first_game, last_game, seed):
+    return _worker_game.simulate_game_range(first_game, last_game, seed)
+
+
+# Like executor.map, but only keeps window calls submitted at a time, so that
+# few chunks are left to finish when the caller stops reading early
+def _ordered_map(executor, function, arguments, window):
+    pending = deque()
+    for call_arguments in arguments:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, *call_arguments))
+    while pending:
+        yield pending.popleft().result()
+
+
 ## Custom logging
 @staticmethod
 def log(message):
@@ -767,13 +2280,145 @@ class IllegalMoveError(Exception):
 # Set to true for manual gameplay
 ENABLE_CONSOLE = False
 
+
+## Command line
+def parse_seat(value):
+    # "color=strategy" pairs of the --seat option
+    color, separator, strategy = value.partition("=")
+    if not separator or strategy not in STRATEGIES:
+        raise argparse.ArgumentTypeError(
+            f"expected color=strategy with a strategy out of {', '.join(STRATEGIES)}"
+        )
+    return color, strategy
+
+
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Ludo games.")
+    parser.add_argument(
+        "-n", "--games", type=int, default=1000, help="number of games to simulate"
+    )
+    parser.add_argument(
+        "--seat",
+        type=parse_seat,
+        action="append",
+        default=[],
+        metavar="COLOR=STRATEGY",
+        help=f"strategy of a seat, one of {', '.join(STRATEGIES)} (repeatable)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="wrap the deterministic strategies of all seats in a CachedStrategy",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="seed of the run")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes of the object engines"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=[*STATE_BACKENDS, "batch"],
+        default="occupancy",
+        help="board backend of LudoGame, or the NumPy BatchLudoGame",
+    )
+    parser.add_argument(
+        "--format", choices=RESULT_SINKS, default="json", help="results format"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="results path, the format's default if unset",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time the phases of the game loop and print a summary table",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        default=None,
+        help="also write the profile as JSON to PATH, implies --profile",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=None,
+        help="stop once the win rates are ranked at this confidence, e.g. 0.99, "
+        "the game count is then the maximum",
+    )
+    args = parser.parse_args(argv)
+    if args.games < 0:
+        parser.error("the number of games can not be negative")
+    if args.seed is not None and args.seed < 0:
+        parser.error("the seed can not be negative")
+    if args.workers < 1:
+        parser.error("at least one worker is needed")
+    if args.confidence is not None and not 0 < args.confidence < 1:
+        parser.error("the confidence has to be between 0 and 1")
+    if args.workers != 1 and args.engine == "batch":
+        parser.error("the batch engine runs in one process, --workers does not apply")
+    profile = args.profile or args.profile_json is not None
+    if profile and args.engine == "batch":
+        parser.error("the batch engine has no game loop to profile")
+
+    strategies = {
+        color: STRATEGIES[strategy_name]() for color, strategy_name in args.seat
+    }
+
+    backend = "occupancy" if args.engine == "batch" else args.engine
+    try:
+        game = LudoGame(backend=backend, strategies=strategies, profile=profile)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.cache:
+        # Wraps the default seats as well, the wrapper keeps strategy.game
+        for player in game.players.values():
+            if player.strategy.deterministic:
+                player.strategy = CachedStrategy(player.strategy)
+
+    sink_type = RESULT_SINKS[args.format]
+    sink = sink_type() if args.output is None else sink_type(args.output)
+
+    start_time = time.perf_counter()
+    if args.engine == "batch":
+        from batch_engine import BatchLudoGame
+
+        try:
+            batch_game = BatchLudoGame(game)
+        except ValueError as error:
+            parser.error(str(error))
+        summary = batch_game.simulate_games(
+            args.games, seed=args.seed, sink=sink, confidence=args.confidence
+        )
+    else:
+        summary = game.simulate_games(
+            args.games,
+            workers=args.workers,
+            seed=args.seed,
+            sink=sink,
+            confidence=args.confidence,
+        )
+        if args.profile_json is not None:
+            with open(args.profile_json, "w") as profile_file:
+                json.dump(summary["profile"], profile_file, indent=4)
+    elapsed = time.perf_counter() - start_time
+
+    games_played = summary["games_played"]
+    print(
+        f"Simulated {games_played} games in {elapsed:.2f} s "
+        f"({games_played / elapsed:.1f} games/s)"
+    )
+
+
 ## Start single game:
 # game = LudoGame(clearConsole=False, interactive=True, turnTime=0.01, starting_player="random")
 # game.play_game()
 
 ## Start simulation:
-number_of_games = 1000
-game_simulation = LudoGame(
-    clearConsole=False, interactive=False, turnTime=0.0, starting_player="random"
-)
-game_simulation.simulate_games(number_of_games)
+# The CLI runs on the imported main module instead of __main__, so worker
+# processes and the batch engine see the same classes
+if __name__ == "__main__":
+    import main
+
+    main.run_cli()
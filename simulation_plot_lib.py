@@ -1,104 +1,261 @@
+import argparse
 from collections import Counter
 import json
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import norm
+
+# matplotlib and scipy are imported by the plot functions on first use, so that
+# loading results and calculating metrics does not pay for them
 
 metrics = None
 data = None
+results_path = "batch_game_log.json"
+
+# Increase when the metrics change, so that older cached metrics are ignored
+METRICS_CACHE_VERSION = 1
+
+
+def load_json_lines(path):
+    # Rebuild the batch_game_log.json layout from a file written by JsonLinesSink
+    with open(path) as log_file:
+        header = json.loads(log_file.readline())["header"]
+        fields = header["fields"]
+        players = {
+            color: {"strategy": strategy, **{field: [] for field in fields}}
+            for color, strategy in header["strategies"].items()
+        }
+        games_played = 0
+        for line in log_file:
+            # A crash while writing leaves a torn last line, the games before
+            # it are still used
+            if not line.endswith("\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "summary" in record:
+                break
+            for color, values in record.items():
+                for field, value in zip(fields, values):
+                    players[color][field].append(value)
+            games_played += 1
+
+    for player_data in players.values():
+        player_data["turns_until_win"] = [
+            turns if won else False
+            for turns, won in zip(player_data["turns_taken"], player_data["games_won"])
+        ]
+
+    # A run that crashed has no summary, the games written so far are still used
+    return {"games_played": games_played, "seed": header["seed"], "players": players}
+
+
+class ColumnarPlayerData(dict):
+    # turns_until_win only holds the turns of won games, like the JSON lists
+    # after filtering out False, and is only computed when used
+    def __missing__(self, key):
+        if key != "turns_until_win":
+            raise KeyError(key)
+        self[key] = self["turns_taken"][self["games_won"]]
+        return self[key]
+
+
+def load_columns(path):
+    # Memory-map the columns written by ColumnarSink, nothing is read until used
+    with open(os.path.join(path, "header.json")) as header_file:
+        header = json.load(header_file)
+    games_played = header["games_played"]
+
+    players = {}
+    for color, strategy in header["strategies"].items():
+        player_data = ColumnarPlayerData(strategy=strategy)
+        for field in header["fields"]:
+            column = np.load(os.path.join(path, f"{color}.{field}.npy"), mmap_mode="r")
+            player_data[field] = column[:games_played]
+        players[color] = player_data
 
+    return {"games_played": games_played, "seed": header["seed"], "players": players}
+
+
+def load_results(path):
+    if os.path.isdir(path):
+        return load_columns(path)
+    if path.endswith(".jsonl"):
+        return load_json_lines(path)
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+def count_games_by(values, games):
+    # Number of selected games per value, over all values seen in any game
+    return np.bincount(values[games], minlength=values.max() + 1).astype(float)
+
+
+def load_data():
+    global data
 
-def calculate_metrics(overwrite=False):
+    if data is None:
+        # Load the results of the simulation
+        data = load_results(results_path)
+        # Convert yellow to orange for better visibility
+        if "yellow" in data["players"].keys(): 
+            data["players"]["orange"] = data["players"].pop("yellow")
+
+    return data
+
+
+def metrics_cache_path(path):
+    # The metrics are cached next to the results file or directory
+    return os.path.normpath(path) + ".metrics.npz"
+
+
+def results_version(path):
+    # The results change together with their file, or the header of a columns directory
+    if os.path.isdir(path):
+        path = os.path.join(path, "header.json")
+    stat = os.stat(path)
+    return [METRICS_CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+
+
+def load_cached_metrics(path):
+    # The arrays are stored as they are, everything else as JSON in "header".
+    # Nothing is unpickled, so a cache file next to shared results runs no code
+    try:
+        with np.load(metrics_cache_path(path), allow_pickle=False) as cache_file:
+            header = json.loads(str(cache_file["header"]))
+            if header["version"] != results_version(path):
+                return None
+            metrics = header["metrics"]
+            for color in metrics["colors"]:
+                for name in header["arrays"]:
+                    metrics[color][name] = cache_file[f"{color}/{name}"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return metrics
+
+
+def save_cached_metrics(path, version, metrics):
+    cache_path = metrics_cache_path(path)
+    header = {
+        "version": version,
+        "arrays": [],
+        "metrics": {"colors": metrics["colors"], "n": metrics["n"]},
+    }
+    arrays = {}
+    for color in metrics["colors"]:
+        header["metrics"][color] = {}
+        for name, value in metrics[color].items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{color}/{name}"] = value
+                if name not in header["arrays"]:
+                    header["arrays"].append(name)
+            else:
+                header["metrics"][color][name] = value if isinstance(value, str) else float(value)
+    try:
+        with open(cache_path + ".tmp", "wb") as cache_file:
+            np.savez(cache_file, header=np.array(json.dumps(header)), **arrays)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        # Results in read-only places are simply not cached
+        pass
+
+
+def calculate_metrics(overwrite=False, path=None):
     global metrics
     global data
+    global results_path
+
+    if path is not None and path != results_path:
+        # Metrics of other results are not reused
+        results_path = path
+        metrics = None
 
     if metrics != None and not overwrite:
         return metrics
 
-    # Load JSON data from the file
-    with open("batch_game_log.json") as json_file:
-        data = json.load(json_file)
-    # Convert yellow to orange for better visibility
-    if "yellow" in data["players"].keys(): 
-        data["players"]["orange"] = data["players"].pop("yellow")
+    # overwrite recalculates the metrics without looking at the cache
+    data = None
+    metrics = None if overwrite else load_cached_metrics(results_path)
+    if metrics is not None:
+        return metrics
+
+    # Taken before reading, so results written meanwhile are not cached as current
+    version = results_version(results_path)
+    data = load_data()
 
     metrics = {}
     # Extract relevant data
     metrics["colors"] = list(data["players"].keys())
     metrics["n"] = data["games_played"]
 
-    # Calculate metrics
+    # Calculate metrics, all in linear time on arrays
     for color in metrics["colors"]:
         color_metrics = {}
         player_data = data["players"][color]
 
-        color_metrics["strategy"] = player_data["strategy"]
+        # JSON lists become arrays once, memory-mapped columns are used as they are
+        games_won = np.asarray(player_data["games_won"], dtype=bool)
+        turns_taken = np.asarray(player_data["turns_taken"])
+        tokens_captured = np.asarray(player_data["tokens_captured"])
+        tokens_beaten = np.asarray(player_data["tokens_beaten"])
+        games_lost = ~games_won
 
-        color_metrics["win_rates"] =  np.mean(player_data['games_won']) / 100
-
-        cumulative_wins = [sum(player_data['games_won'][:i+1]) for i in range(len(player_data['games_won']))]
-        color_metrics["win_rates_over_time"] =  [x / (i+1) for i, x in enumerate(cumulative_wins)]
+        color_metrics["strategy"] = player_data["strategy"]
 
-        won_tokens_captured = np.zeros(max(player_data["tokens_captured"])+1)
-        lost_tokens_beaten = np.zeros(max(player_data["tokens_beaten"])+1)
-        lost_tokens_captured = np.zeros(max(player_data["tokens_captured"])+1)
-        won_tokens_beaten = np.zeros(max(player_data["tokens_beaten"])+1)
-        lost_tokens_beaten = np.zeros(max(player_data["tokens_beaten"])+1)
-        lost_turns_taken = np.zeros(max(player_data["turns_taken"])+1)
-        won_turns_taken = np.zeros(max(player_data["turns_taken"])+1)
+        color_metrics["win_rates"] = np.mean(games_won) / 100
 
-        color_metrics["average_tokens_captured"] = np.mean(
-            player_data["tokens_captured"]
+        color_metrics["win_rates_over_time"] = np.cumsum(games_won) / np.arange(
+            1, len(games_won) + 1
         )
-        color_metrics["average_tokens_lost"] = np.mean(player_data["tokens_beaten"])
+
+        color_metrics["average_tokens_captured"] = np.mean(tokens_captured)
+        color_metrics["average_tokens_lost"] = np.mean(tokens_beaten)
         color_metrics["average_squares_moved"] = np.mean(
-            player_data["total_squares_moved"]
+            np.asarray(player_data["total_squares_moved"])
         )
 
-        turns_until_win = [x for x in player_data["turns_until_win"] if x is not False]
+        # Turns until win are the turns taken in won games
+        turns_until_win = turns_taken[games_won]
         color_metrics["average_turns_until_win"] = (
-            np.mean(turns_until_win) if turns_until_win else 0
+            np.mean(turns_until_win) if len(turns_until_win) else 0
         )
 
-        won_tokens_captured = np.zeros(max(player_data["tokens_captured"]) + 1)
-        lost_tokens_beaten = np.zeros(max(player_data["tokens_beaten"]) + 1)
-        lost_tokens_captured = np.zeros(max(player_data["tokens_captured"]) + 1)
-        won_tokens_beaten = np.zeros(max(player_data["tokens_beaten"]) + 1)
-        lost_tokens_beaten = np.zeros(max(player_data["tokens_beaten"]) + 1)
-        lost_turns_taken = np.zeros(max(player_data["turns_taken"]) + 1)
-        won_turns_taken = np.zeros(max(player_data["turns_taken"]) + 1)
-
-        for turns_taken, captured_tokens, tokens_beaten, won in zip(
-            player_data["turns_taken"],
-            player_data["tokens_captured"],
-            player_data["tokens_beaten"],
-            player_data["games_won"],
-        ):
-            if won:
-                won_tokens_captured[captured_tokens] += 1
-                won_tokens_beaten[tokens_beaten] += 1
-                won_turns_taken[turns_taken] += 1
-            else:
-                lost_tokens_beaten[tokens_beaten] += 1
-                lost_tokens_captured[captured_tokens] += 1
-                lost_turns_taken[turns_taken] += 1
-
-        color_metrics["games_won_by_tokens_captured"] = won_tokens_captured
-        color_metrics["games_lost_by_tokens_beaten"] = lost_tokens_beaten
-        color_metrics["games_lost_by_tokens_captured"] = lost_tokens_captured
-        color_metrics["games_won_by_tokens_beaten"] = won_tokens_beaten
-        color_metrics["games_lost_by_tokens_beaten"] = lost_tokens_beaten
-        color_metrics["games_lost_by_turns_taken"] = lost_turns_taken
-        color_metrics["games_won_by_turns_taken"] = won_turns_taken
+        color_metrics["games_won_by_tokens_captured"] = count_games_by(tokens_captured, games_won)
+        color_metrics["games_lost_by_tokens_beaten"] = count_games_by(tokens_beaten, games_lost)
+        color_metrics["games_lost_by_tokens_captured"] = count_games_by(tokens_captured, games_lost)
+        color_metrics["games_won_by_tokens_beaten"] = count_games_by(tokens_beaten, games_won)
+        color_metrics["games_lost_by_turns_taken"] = count_games_by(turns_taken, games_lost)
+        color_metrics["games_won_by_turns_taken"] = count_games_by(turns_taken, games_won)
 
         metrics[color] = color_metrics
 
+    save_cached_metrics(results_path, version, metrics)
     return metrics
 
 
+def show_figure(save_path=None):
+    import matplotlib.pyplot as plt
+
+    # Shows the figure, or writes it to a file and closes it in report mode
+    if save_path is None:
+        plt.show()
+    else:
+        plt.savefig(save_path)
+        plt.close()
+
+
 def player_metric_pie(
-    metric_name: str, title: str, red=True, green=True, blue=True, orange=True
+    metric_name: str,
+    title: str,
+    red=True,
+    green=True,
+    blue=True,
+    orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
 
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
@@ -122,7 +279,7 @@ def player_metric_pie(
     plt.pie(y_datas, colors=metrics["colors"], labels=[metrics[color]["strategy"] for color in metrics["colors"]], autopct='%1.0f%%')
     
 
-    plt.show()
+    show_figure(save_path)
 
 
 def player_metric_line(
@@ -134,7 +291,10 @@ def player_metric_line(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
 
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
@@ -156,7 +316,7 @@ def player_metric_line(
     
 
     plt.legend()
-    plt.show()
+    show_figure(save_path)
 
 
 def player_metric_lines(
@@ -170,7 +330,10 @@ def player_metric_lines(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
 
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
@@ -201,7 +364,7 @@ def player_metric_lines(
                 ax.legend()
 
     
-    plt.show()
+    show_figure(save_path)
 
 
 def player_metric_bar(
@@ -212,7 +375,10 @@ def player_metric_bar(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
 
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
@@ -236,7 +402,7 @@ def player_metric_bar(
     plt.ylabel(y_label)
     
 
-    plt.show()
+    show_figure(save_path)
 
 
 def player_metric_bars(
@@ -249,7 +415,10 @@ def player_metric_bars(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
     bar_width = 0.35
@@ -293,7 +462,7 @@ def player_metric_bars(
     by_label = dict(zip(labels, handles))
     plt.legend(by_label.values(), by_label.keys())
 
-    plt.show()
+    show_figure(save_path)
 
 
 def player_data_histogram(
@@ -308,8 +477,12 @@ def player_data_histogram(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
+    load_data()
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
     
     plt.figure(figsize=(5, 3))
@@ -365,8 +538,7 @@ def player_data_histogram(
     plt.ylabel(y_label)
     
     plt.legend()
-    plt.show()
-    plt.show()
+    show_figure(save_path)
 
 
 def player_data_gauss_fit(
@@ -380,8 +552,13 @@ def player_data_gauss_fit(
     green=True,
     blue=True,
     orange=True,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+    from scipy.stats import norm
+
     calculate_metrics()
+    load_data()
     enabled = {"red": red, "green": green, "blue": blue, "orange": orange}
     
     plt.figure(figsize=(5, 3))
@@ -403,13 +580,21 @@ def player_data_gauss_fit(
     plt.ylabel(y_label)
     
     plt.legend()
-    plt.show()
+    show_figure(save_path)
 
 
 def player_data_scatter(
-    data_name1: str, data_name2: str, x_label: str, y_label: str, title: str
+    data_name1: str,
+    data_name2: str,
+    x_label: str,
+    y_label: str,
+    title: str,
+    save_path: str | None = None,
 ):
+    import matplotlib.pyplot as plt
+
     calculate_metrics()
+    load_data()
 
     fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(10, 8))
     axes = axes.flatten()
@@ -433,97 +618,196 @@ def player_data_scatter(
         ax.set_ylabel(y_label)
         ax.set_title(metrics[color]["strategy"])
 
-    plt.show()
-
-
-# Exmaple usages
-
-player_metric_line(
-    metric_name="games_won_by_tokens_captured",
-    x_label="Tokens Captured",
-    y_label="Games Won",
-    title="Games Won by Token Captured",
-)
-
-player_metric_line(
-    metric_name="games_lost_by_tokens_beaten",
-    x_label="Tokens Beaten",
-    y_label="Games Lost",
-    title="Games Lost by Tokens Beaten",
-)
-
-player_metric_line(
-    metric_name="games_won_by_turns_taken",
-    x_label="Turns Taken",
-    y_label="Games Won",
-    title="Games Won by Turns Taken",
-)
-
-player_metric_lines(
-    metric_names=["games_won_by_turns_taken", "games_lost_by_turns_taken"],
-    x_label="Turns Taken",
-    y_label="Games Won/Lost",
-    colors=["lightgreen", "lightcoral"],
-    labels=["Games Won", "Games Lost"],
-    title="Games Won/Lost by Turns Taken",
-)
-
-
-player_metric_bar(
-    metric_name="win_rates",
-    y_label="Percentage of Games Won",
-    title="Strategy Winrates",
-)
-
-player_metric_pie(metric_name="win_rates", title="Strategy Winrates")
-
-player_metric_bars(
-    metric_names=["average_tokens_captured", "average_tokens_lost"],
-    y_label="Tokens",
-    title="Average Tokens Captured/Lost by Strategy",
-    colors=["lightgreen", "lightcoral"],
-    labels=["Tokens Captured", "Tokens Lost"],
-)
-
-player_data_histogram(
-    data_name="total_squares_moved",
-    x_label="Squares Moved per Game",
-    y_label="Frequency",
-    title="Histogram of Moved Squares by Strategy",
-    bin_num=30,
-)
-
-player_data_gauss_fit(
-    data_name="total_squares_moved",
-    x_label="Squares Moved per Game",
-    y_label="Frequency",
-    title="Distribution of Moved Squares by Strategy",
-    resolution=100,
-)
-
-player_data_scatter(
-    data_name1="total_squares_moved",
-    data_name2="tokens_captured",
-    x_label="Total Squares Moved",
-    y_label="Tokens Captured",
-    title="Scatter Plots of X",
-)
-
-player_data_histogram(
-    data_name="turns_until_win",
-    x_label="Turns Until Win",
-    y_label="Frequency",
-    title="Histogram of Turns Until Win by Strategy",
-    bin_num=30,
-)
-
-player_data_gauss_fit(data_name="turns_until_win",
-                      x_label="Turns Until Win",
-                      y_label="Frequency",
-                      title="Distribution of Turns Until Win by Strategy",
-                      resolution=100)
-
-player_metric_line(metric_name="win_rates_over_time", 
-                x_label="Games Played", 
-                y_label="Win Rate", 
-                title="Win Rates Over Time")
+    show_figure(save_path)
+
+
+## Report
+# Figures of the report as (file name, plot function, arguments), in the order
+# they are shown when the library is run without a report directory
+REPORT_FIGURES = [
+    (
+        "games_won_by_tokens_captured",
+        player_metric_line,
+        dict(
+            metric_name="games_won_by_tokens_captured",
+            x_label="Tokens Captured",
+            y_label="Games Won",
+            title="Games Won by Token Captured",
+        ),
+    ),
+    (
+        "games_lost_by_tokens_beaten",
+        player_metric_line,
+        dict(
+            metric_name="games_lost_by_tokens_beaten",
+            x_label="Tokens Beaten",
+            y_label="Games Lost",
+            title="Games Lost by Tokens Beaten",
+        ),
+    ),
+    (
+        "games_won_by_turns_taken",
+        player_metric_line,
+        dict(
+            metric_name="games_won_by_turns_taken",
+            x_label="Turns Taken",
+            y_label="Games Won",
+            title="Games Won by Turns Taken",
+        ),
+    ),
+    (
+        "games_won_lost_by_turns_taken",
+        player_metric_lines,
+        dict(
+            metric_names=["games_won_by_turns_taken", "games_lost_by_turns_taken"],
+            x_label="Turns Taken",
+            y_label="Games Won/Lost",
+            colors=["lightgreen", "lightcoral"],
+            labels=["Games Won", "Games Lost"],
+            title="Games Won/Lost by Turns Taken",
+        ),
+    ),
+    (
+        "win_rates_bar",
+        player_metric_bar,
+        dict(
+            metric_name="win_rates",
+            y_label="Percentage of Games Won",
+            title="Strategy Winrates",
+        ),
+    ),
+    (
+        "win_rates_pie",
+        player_metric_pie,
+        dict(metric_name="win_rates", title="Strategy Winrates"),
+    ),
+    (
+        "average_tokens_captured_lost",
+        player_metric_bars,
+        dict(
+            metric_names=["average_tokens_captured", "average_tokens_lost"],
+            y_label="Tokens",
+            title="Average Tokens Captured/Lost by Strategy",
+            colors=["lightgreen", "lightcoral"],
+            labels=["Tokens Captured", "Tokens Lost"],
+        ),
+    ),
+    (
+        "total_squares_moved_histogram",
+        player_data_histogram,
+        dict(
+            data_name="total_squares_moved",
+            x_label="Squares Moved per Game",
+            y_label="Frequency",
+            title="Histogram of Moved Squares by Strategy",
+            bin_num=30,
+        ),
+    ),
+    (
+        "total_squares_moved_distribution",
+        player_data_gauss_fit,
+        dict(
+            data_name="total_squares_moved",
+            x_label="Squares Moved per Game",
+            y_label="Frequency",
+            title="Distribution of Moved Squares by Strategy",
+            resolution=100,
+        ),
+    ),
+    (
+        "total_squares_moved_tokens_captured_scatter",
+        player_data_scatter,
+        dict(
+            data_name1="total_squares_moved",
+            data_name2="tokens_captured",
+            x_label="Total Squares Moved",
+            y_label="Tokens Captured",
+            title="Scatter Plots of X",
+        ),
+    ),
+    (
+        "turns_until_win_histogram",
+        player_data_histogram,
+        dict(
+            data_name="turns_until_win",
+            x_label="Turns Until Win",
+            y_label="Frequency",
+            title="Histogram of Turns Until Win by Strategy",
+            bin_num=30,
+        ),
+    ),
+    (
+        "turns_until_win_distribution",
+        player_data_gauss_fit,
+        dict(
+            data_name="turns_until_win",
+            x_label="Turns Until Win",
+            y_label="Frequency",
+            title="Distribution of Turns Until Win by Strategy",
+            resolution=100,
+        ),
+    ),
+    (
+        "win_rates_over_time",
+        player_metric_line,
+        dict(
+            metric_name="win_rates_over_time",
+            x_label="Games Played",
+            y_label="Win Rate",
+            title="Win Rates Over Time",
+        ),
+    ),
+]
+
+
+def init_report_worker(path):
+    import matplotlib.pyplot as plt
+
+    # Workers render without a display and share the cached metrics
+    plt.switch_backend("Agg")
+    calculate_metrics(path=path)
+
+
+def render_report_figure(figure_index, save_path):
+    _, plot_function, arguments = REPORT_FIGURES[figure_index]
+    plot_function(**arguments, save_path=save_path)
+    return save_path
+
+
+def build_report(output_dir="report", path=None, workers=None, file_format="png"):
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Metrics are calculated once here, the workers load them from the cache
+    calculate_metrics(path=path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    save_paths = [
+        os.path.join(output_dir, f"{file_name}.{file_format}")
+        for file_name, _, _ in REPORT_FIGURES
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_report_worker, initargs=(results_path,)
+    ) as executor:
+        for save_path in executor.map(
+            render_report_figure, range(len(REPORT_FIGURES)), save_paths
+        ):
+            print(f"Saved {save_path}")
+
+    return save_paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plot the results of a Ludo simulation.")
+    parser.add_argument("--results", default=results_path, help="results file or columns directory")
+    parser.add_argument("--report", metavar="DIR", help="write all figures to DIR instead of showing them")
+    parser.add_argument("--workers", type=int, default=None, help="processes rendering the report")
+    parser.add_argument("--format", default="png", help="file format of the report figures")
+    args = parser.parse_args()
+
+    if args.report:
+        build_report(args.report, args.results, args.workers, args.format)
+    else:
+        # Show the figures one after another
+        calculate_metrics(path=args.results)
+        for _, plot_function, arguments in REPORT_FIGURES:
+            plot_function(**arguments)
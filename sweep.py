@@ -0,0 +1,393 @@
+import argparse
+from functools import partial
+from itertools import product
+import json
+import math
+import os
+import random
+import time
+
+from compare import PairedDifference, play_paired_unit
+from main import STRATEGIES, LudoGame, parse_seat
+
+## Search spaces
+# Values tried for the constructor parameters of the strategies. The default
+# parameters of a strategy are always played as well, as the baseline
+SEARCH_SPACES = {
+    "aggressive": {
+        "approach_weight": [2, 5, 10, 20, 40],
+        "retreat_penalty": [0, 5, 10, 20, 40],
+    },
+    "smart": {
+        "spawn_risk": [0, 1, 3, 5, 8],
+        "risk_range": [3, 6, 9, 12],
+        "progress_divisor": [40, 100, 400, 1000],
+    },
+}
+
+
+def default_parameters(strategy_name) -> dict:
+    strategy = STRATEGIES[strategy_name]()
+    return {name: getattr(strategy, name) for name in SEARCH_SPACES[strategy_name]}
+
+
+# Seat of the strategy in the default lineup, yellow if it has none
+def default_color(strategy_name) -> str:
+    for color, player in LudoGame().players.items():
+        if type(player.strategy) is STRATEGIES[strategy_name]:
+            return color
+    return "yellow"
+
+
+def grid_configurations(space) -> list[dict]:
+    return [dict(zip(space, values)) for values in product(*space.values())]
+
+
+# Uniform samples between the smallest and largest value of every parameter,
+# whole numbers if all its values are
+def random_configurations(space, samples, rng) -> list[dict]:
+    configurations = []
+    for _ in range(samples):
+        configuration = {}
+        for name, values in space.items():
+            if all(float(value).is_integer() for value in values):
+                configuration[name] = rng.randint(int(min(values)), int(max(values)))
+            else:
+                configuration[name] = rng.uniform(min(values), max(values))
+        configurations.append(configuration)
+    return configurations
+
+
+def format_parameters(parameters) -> str:
+    return " ".join(f"{name}={value:g}" for name, value in parameters.items())
+
+
+## Workers
+# Wins of the color with the configured strategy on games first_game to
+# last_game. Every configuration plays the same seeded games with per player
+# dice, so the configurations are compared on common random numbers
+def play_configuration_unit(
+    strategy_name, parameters, color, opponents, first_game, last_game, seed
+) -> list[int]:
+    strategy_factory = partial(STRATEGIES[strategy_name], **parameters)
+    wins = play_paired_unit(
+        color, [strategy_factory], opponents, first_game, last_game, seed, False
+    )
+    return wins[0][0]
+
+
+# Yields (configuration index, first game, wins) of every unit once it is done
+def play_units(strategy_name, configurations, units, color, opponents, seed, executor):
+    if executor is None:
+        for index, first_game, last_game in units:
+            yield index, first_game, play_configuration_unit(
+                strategy_name,
+                configurations[index],
+                color,
+                opponents,
+                first_game,
+                last_game,
+                seed,
+            )
+        return
+
+    from concurrent.futures import as_completed
+
+    futures = {
+        executor.submit(
+            play_configuration_unit,
+            strategy_name,
+            configurations[index],
+            color,
+            opponents,
+            first_game,
+            last_game,
+            seed,
+        ): (index, first_game)
+        for index, first_game, last_game in units
+    }
+    for future in as_completed(futures):
+        index, first_game = futures[future]
+        yield index, first_game, future.result()
+
+
+## Sweep
+# Games per configuration in every round of successive halving, from
+# min_games growing by eta up to max_games
+def halving_budgets(min_games, max_games, eta) -> list[int]:
+    budgets = [min(min_games, max_games)]
+    while budgets[-1] < max_games:
+        budgets.append(min(budgets[-1] * eta, max_games))
+    return budgets
+
+
+def run_sweep(
+    strategy_name: str,
+    configurations: list[dict],
+    color: str | None = None,
+    opponents: dict[str, str] | None = None,
+    max_games: int = 1000,
+    min_games: int = 100,
+    eta: int = 3,
+    workers: int | None = None,
+    unit_size: int = 50,
+    seed: int | None = None,
+    confidence: float = 0.99,
+) -> dict:
+    # Successive halving: all configurations play min_games games, then only
+    # the best 1 / eta of them continue on eta times as many games, until
+    # max_games. With min_games >= max_games every configuration plays all
+    # games. The baseline with the default parameters is never dropped
+    if strategy_name not in SEARCH_SPACES:
+        raise ValueError(f"No search space for {strategy_name}.")
+    if eta < 2:
+        raise ValueError("eta has to be at least 2.")
+    if min(min_games, max_games, unit_size) < 1:
+        raise ValueError("min_games, max_games and unit_size have to be at least 1.")
+    if color is None:
+        color = default_color(strategy_name)
+    if color not in LudoGame.STARTING_POSITIONS:
+        raise ValueError(f"Unknown player color {color}.")
+    opponents = dict(opponents or {})
+    opponents.pop(color, None)
+    if seed is None:
+        seed = random.randrange(2**32)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    configurations = list(configurations)
+    # The strategies reject invalid parameters before any game is played
+    for configuration in configurations:
+        STRATEGIES[strategy_name](**configuration)
+    baseline = default_parameters(strategy_name)
+    if baseline not in configurations:
+        configurations.append(baseline)
+    baseline_index = configurations.index(baseline)
+
+    wins = [[0] * max_games for _ in configurations]
+    games = [0] * len(configurations)
+    dropped_after = [None] * len(configurations)
+    survivors = list(range(len(configurations)))
+    rounds = []
+
+    start_time = time.perf_counter()
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        budgets = halving_budgets(min_games, max_games, eta)
+        played = 0
+        for round_index, budget in enumerate(budgets):
+            print(
+                f"Round {round_index + 1}: {len(survivors)} configurations, "
+                f"{budget} games each..."
+            )
+            # Survivors continue on the games after the ones they played
+            units = [
+                (index, first_game, min(first_game + unit_size, budget))
+                for first_game in range(played, budget, unit_size)
+                for index in survivors
+            ]
+            for index, first_game, unit_wins in play_units(
+                strategy_name, configurations, units, color, opponents, seed, executor
+            ):
+                wins[index][first_game : first_game + len(unit_wins)] = unit_wins
+            for index in survivors:
+                games[index] = budget
+            played = budget
+            rounds.append({"games": budget, "configurations": len(survivors)})
+
+            if round_index == len(budgets) - 1:
+                break
+            # All survivors played the same games, so their wins are comparable
+            ranking = sorted(survivors, key=lambda index: -sum(wins[index][:budget]))
+            survivors = ranking[: max(1, math.ceil(len(ranking) / eta))]
+            if baseline_index not in survivors:
+                survivors.append(baseline_index)
+            for index in ranking:
+                if index not in survivors:
+                    dropped_after[index] = budget
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - start_time
+
+    # Configurations that got further rank first, then by win rate. The
+    # difference to the baseline is paired over the games both played
+    rows = []
+    for index, parameters in enumerate(configurations):
+        difference = PairedDifference(confidence=confidence)
+        for game_index in range(games[index]):
+            difference.add(wins[baseline_index][game_index], wins[index][game_index])
+        rows.append(
+            {
+                "parameters": parameters,
+                "baseline": index == baseline_index,
+                "games": games[index],
+                "win_rate": difference.win_rates()[1],
+                "difference": difference.mean_difference(),
+                "interval": list(difference.interval()),
+                "dropped_after": dropped_after[index],
+            }
+        )
+    rows.sort(key=lambda row: (-row["games"], -row["win_rate"]))
+
+    return {
+        "settings": {
+            "strategy": strategy_name,
+            "color": color,
+            "opponents": opponents,
+            "max_games": max_games,
+            "min_games": min_games,
+            "eta": eta,
+            "seed": seed,
+            "confidence": confidence,
+        },
+        "games_played": sum(games),
+        "seconds": elapsed,
+        "rounds": rounds,
+        "ranking": rows,
+    }
+
+
+def print_ranking(results, top=20):
+    settings = results["settings"]
+    print(
+        f"\n{settings['strategy']} on {settings['color']}, difference to the "
+        f"defaults at {settings['confidence']} confidence"
+    )
+    print(
+        f"{'rank':>4} {'games':>6} {'win rate':>9} {'difference':>11} "
+        f"{'interval':>18}  parameters"
+    )
+    for rank, row in enumerate(results["ranking"][:top], 1):
+        low, high = row["interval"]
+        defaults = " (defaults)" if row["baseline"] else ""
+        print(
+            f"{rank:>4} {row['games']:>6} {row['win_rate']:>9.3f} "
+            f"{row['difference']:>+11.3f} [{low:>+7.3f}, {high:>+7.3f}]  "
+            f"{format_parameters(row['parameters'])}{defaults}"
+        )
+
+
+def parse_values(text) -> tuple[str, list]:
+    name, separator, values = text.partition("=")
+    if not separator or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... but got {text}")
+    parsed = []
+    for value in values.split(","):
+        try:
+            parsed.append(int(value))
+        except ValueError:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"{value} is not a number")
+    return name, parsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Search the parameters of a strategy with successive halving."
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=SEARCH_SPACES,
+        default="smart",
+        help="strategy whose parameters are searched",
+    )
+    parser.add_argument(
+        "--search",
+        choices=["grid", "random"],
+        default="grid",
+        help="every combination of the values or random samples in their range",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=20, help="configurations of a random search"
+    )
+    parser.add_argument(
+        "--values",
+        type=parse_values,
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="values of a parameter instead of the built-in ones (repeatable)",
+    )
+    parser.add_argument(
+        "--color", default=None, help="seat of the strategy, by default its own"
+    )
+    parser.add_argument(
+        "--seat",
+        type=parse_seat,
+        action="append",
+        default=[],
+        metavar="COLOR=STRATEGY",
+        help="strategy of another seat (repeatable)",
+    )
+    parser.add_argument(
+        "-n", "--games", type=int, default=1000, help="games of the best configurations"
+    )
+    parser.add_argument(
+        "--min-games",
+        type=int,
+        default=100,
+        help="games of every configuration in the first round",
+    )
+    parser.add_argument(
+        "--eta",
+        type=int,
+        default=3,
+        help="1 / eta of the configurations continue on eta times the games",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--unit-size", type=int, default=50, help="games per unit")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the games")
+    parser.add_argument(
+        "--confidence", type=float, default=0.99, help="confidence of the intervals"
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="configurations printed in the ranking"
+    )
+    parser.add_argument("-o", "--output", default="sweep.json", help="results file")
+    args = parser.parse_args()
+    if not 0 < args.confidence < 1:
+        parser.error("the confidence has to be between 0 and 1")
+
+    space = dict(SEARCH_SPACES[args.strategy])
+    for name, values in args.values:
+        if name not in space:
+            parser.error(f"{args.strategy} has no parameter {name}")
+        space[name] = values
+    if args.search == "grid":
+        configurations = grid_configurations(space)
+    else:
+        configurations = random_configurations(
+            space, args.samples, random.Random(args.seed)
+        )
+
+    try:
+        results = run_sweep(
+            args.strategy,
+            configurations,
+            args.color,
+            dict(args.seat),
+            args.games,
+            args.min_games,
+            args.eta,
+            args.workers,
+            args.unit_size,
+            args.seed,
+            args.confidence,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    print_ranking(results, args.top)
+    print(
+        f"\nPlayed {results['games_played']} games in {results['seconds']:.2f} s "
+        f"({results['games_played'] / results['seconds']:.1f} games/s)"
+    )
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import batch_engine
+from batch_engine import BatchLudoGame
+from benchmarks import record_positions
+from main import (
+    AggressiveStrategy,
+    DefensiveStrategy,
+    LudoGame,
+    SmartStrategy,
+    SpeedrunStrategy,
+)
+
+# Decisions with more than one legal move from seeded games of the default lineup
+POSITIONS = record_positions(100, seed=7)
+
+STRATEGY_FACTORIES = {
+    "speedrun": SpeedrunStrategy,
+    "aggressive": AggressiveStrategy,
+    "defensive": DefensiveStrategy,
+    "smart": SmartStrategy,
+    "aggressive_tuned": lambda: AggressiveStrategy(
+        approach_weight=3, retreat_penalty=30
+    ),
+    "smart_tuned": lambda: SmartStrategy(
+        spawn_risk=5, risk_range=10, progress_divisor=20
+    ),
+}
+
+
+# The recorded positions of one color as arrays of the batch engine
+def position_arrays(color):
+    states, dice, legal_moves = [], [], []
+    for state, moves, dice_roll, player_color in POSITIONS:
+        if player_color == color:
+            states.append(state)
+            dice.append(dice_roll)
+            legal_moves.append(moves)
+    tokens = np.array([player_tokens for _, player_tokens in states], dtype=np.int16)
+    return (
+        states,
+        np.array(dice, dtype=np.int16),
+        legal_moves,
+        tokens[..., 0],
+        tokens[..., 1],
+        tokens[..., 2],
+    )
+
+
+@pytest.mark.parametrize("color", list(LudoGame.STARTING_POSITIONS))
+def test_legal_moves_match(color):
+    seat = list(LudoGame.STARTING_POSITIONS).index(color)
+    _, dice, legal_moves, positions, moved_squares, in_home_positions = position_arrays(
+        color
+    )
+
+    moves, _, _ = batch_engine.get_legal_moves(
+        positions,
+        moved_squares,
+        in_home_positions,
+        seat,
+        dice,
+        LudoGame.STARTING_POSITIONS[color],
+    )
+    for game_index, expected in enumerate(legal_moves):
+        batch_moves = {
+            (token_index, move)
+            for token_index, move in enumerate(moves[game_index].tolist())
+            if move != batch_engine.NO_MOVE
+        }
+        assert batch_moves == {(move[0], move[1].value) for move in expected}
+
+
+@pytest.mark.parametrize("strategy_name", STRATEGY_FACTORIES)
+@pytest.mark.parametrize("color", list(LudoGame.STARTING_POSITIONS))
+def test_selectors_match_select_move(strategy_name, color):
+    strategy_factory = STRATEGY_FACTORIES[strategy_name]
+    game = LudoGame(
+        strategies={c: strategy_factory() for c in LudoGame.STARTING_POSITIONS}
+    )
+    batch_game = BatchLudoGame(game)
+    seat = list(game.players).index(color)
+    strategy = game.players[color].strategy
+    states, dice, legal_moves, positions, moved_squares, in_home_positions = (
+        position_arrays(color)
+    )
+
+    moves, _, _ = batch_engine.get_legal_moves(
+        positions,
+        moved_squares,
+        in_home_positions,
+        seat,
+        dice,
+        LudoGame.STARTING_POSITIONS[color],
+    )
+    selected = batch_game.selectors[seat](
+        moves, dice, seat, positions, moved_squares, batch_game, None
+    )
+    for game_index, state in enumerate(states):
+        game.set_state(state)
+        move = strategy.select_move(
+            legal_moves[game_index],
+            int(dice[game_index]),
+            color,
+            list(game.players.values()),
+        )
+        assert selected[game_index] == move[0]
@@ -0,0 +1,86 @@
+import contextlib
+
+import pytest
+
+from main import (
+    AggressiveStrategy,
+    CachedStrategy,
+    DefensiveStrategy,
+    LRUCache,
+    LudoGame,
+    RandomStrategy,
+    SmartStrategy,
+    SpeedrunStrategy,
+)
+
+
+# Counts the decisions with a choice, which are the ones CachedStrategy looks up
+def counting(strategy_class):
+    class CountingStrategy(strategy_class):
+        choices = 0
+
+        def select_move(self, legal_moves, dice_roll, player_color, all_players):
+            if len(legal_moves) > 1:
+                self.choices += 1
+            return super().select_move(
+                legal_moves, dice_roll, player_color, all_players
+            )
+
+    return CountingStrategy()
+
+
+def play(strategy, number_of_games=20):
+    game = LudoGame(strategies={"yellow": strategy})
+    with contextlib.redirect_stdout(None):
+        games, reports, _ = game.simulate_game_range(0, number_of_games, 4)
+    return games, reports
+
+
+@pytest.mark.parametrize(
+    "strategy_class",
+    [SpeedrunStrategy, AggressiveStrategy, DefensiveStrategy, SmartStrategy],
+)
+def test_cached_decisions_match_the_strategy(strategy_class):
+    plain = counting(strategy_class)
+    expected_games, _ = play(plain)
+
+    wrapped = counting(strategy_class)
+    cached = CachedStrategy(wrapped)
+    games, reports = play(cached)
+    assert games == expected_games
+
+    # Every decision with a choice is looked up once, the strategy only
+    # decides the ones that were not cached yet
+    report = reports["yellow"]
+    assert report["cache_hits"] + report["cache_misses"] == plain.choices
+    assert report["cache_misses"] == wrapped.choices
+    assert len(cached.decisions) == wrapped.choices
+
+    # The same games again are decided from the cache alone
+    games, reports = play(cached)
+    assert games == expected_games
+    assert reports["yellow"] == {"cache_hits": plain.choices, "cache_misses": 0}
+
+
+def test_small_cache_evicts_and_keeps_the_decisions():
+    expected_games, _ = play(SmartStrategy())
+    cached = CachedStrategy(SmartStrategy(), max_size=10)
+    games, _ = play(cached)
+    assert games == expected_games
+    assert len(cached.decisions) == 10
+
+
+def test_lru_cache_evicts_the_least_recently_used_entry():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_random_strategy_is_not_cached():
+    with pytest.raises(ValueError):
+        CachedStrategy(RandomStrategy())
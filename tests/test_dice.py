@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from main import DiceStream, LudoGame
+
+
+def play(game, game_number):
+    random.seed(game_number)
+    game.reset_game()
+    game.choose_starting_player()
+    starting_player = game.turn
+    game.play_game()
+    return starting_player, game.game_record()
+
+
+@pytest.mark.parametrize("per_player", [False, True], ids=["shared", "per_player"])
+def test_replay_gives_the_same_game_and_keeps_the_stream(per_player):
+    game = LudoGame(dice=DiceStream(3, record=True, per_player=per_player))
+    starting_player, record = play(game, 1)
+    rolls = list(game.dice.rolls)
+
+    random.seed(1)
+    assert game.replay_game(rolls, starting_player) == record
+    assert game.dice.rolls == rolls
+
+    # The next game rolls on from the stream, as if there was no replay
+    expected_game = LudoGame(dice=DiceStream(3, record=True, per_player=per_player))
+    play(expected_game, 1)
+    assert play(game, 2) == play(expected_game, 2)
+
+
+def test_per_player_streams_do_not_depend_on_the_order():
+    dice = DiceStream(5, per_player=True)
+    first = [dice.roll(0) for _ in range(20)] + [dice.roll(10) for _ in range(20)]
+    dice.reseed(5)
+    second = [dice.roll(10) for _ in range(20)]
+    assert second == first[20:]
+    assert [dice.roll(0) for _ in range(20)] == first[:20]
+
+
+def test_antithetic_stream_mirrors_the_rolls():
+    dice, antithetic = DiceStream(9), DiceStream(9, antithetic=True)
+    rolls = [dice.roll() for _ in range(1000)]
+    assert [antithetic.roll() for _ in range(1000)] == [7 - roll for roll in rolls]
@@ -0,0 +1,111 @@
+import pytest
+
+from benchmarks import record_positions
+from main import ExpectimaxStrategy, LudoGame, SmartStrategy, Token
+
+# Decisions with more than one legal move from seeded games of the default lineup
+POSITIONS = record_positions(30, seed=11)
+
+
+# Everything make_move changes: tokens, turn, stats, hash and the board backend
+def snapshot(game):
+    return (
+        game.get_state(),
+        tuple(
+            tuple(player.stats.to_dict().items()) for player in game.players.values()
+        ),
+        game.zobrist_hash,
+        tuple(game.occupancy.occupant(square) for square in range(game.BOARD_LENGTH)),
+        tuple(
+            game.occupancy.is_home_slot_taken(color, home_position)
+            for color in game.players
+            for home_position in range(game.HOME_LENGTH + 1)
+        ),
+    )
+
+
+def make_and_unmake(game, color, move, dice_roll):
+    before = snapshot(game)
+    undo_record = game.make_move(color, move[0], dice_roll)
+    assert game.zobrist_hash == game.compute_zobrist_hash()
+    return before, undo_record
+
+
+@pytest.mark.parametrize("backend", ["occupancy", "bitboard"])
+def test_unmake_move_restores_state(backend):
+    game = LudoGame(backend=backend)
+    colors = list(game.players)
+    for state, legal_moves, dice_roll, color in POSITIONS:
+        game.set_state(state)
+        for move in legal_moves:
+            before, undo_record = make_and_unmake(game, color, move, dice_roll)
+
+            # Every move of the next player on top of it, with every dice roll
+            next_color = colors[(colors.index(color) + 1) % len(colors)]
+            for next_roll in range(1, 7):
+                for next_move in game.get_legal_moves(next_color, next_roll):
+                    inner_before, inner_undo_record = make_and_unmake(
+                        game, next_color, next_move, next_roll
+                    )
+                    game.unmake_move(inner_undo_record)
+                    assert snapshot(game) == inner_before
+
+            game.unmake_move(undo_record)
+            assert snapshot(game) == before
+            assert game.zobrist_hash == game.compute_zobrist_hash()
+
+
+def test_move_token_matches_make_move():
+    game = LudoGame()
+
+    # set_state keeps the stats, so both moves start from reset stats
+    def set_state(state):
+        game.set_state(state)
+        for player in game.players.values():
+            player.stats.reset()
+
+    for state, legal_moves, dice_roll, color in POSITIONS:
+        for move in legal_moves:
+            set_state(state)
+            game.make_move(color, move[0], dice_roll)
+            made = snapshot(game)
+            set_state(state)
+            game.move_token(color, move[0], dice_roll)
+            assert snapshot(game) == made
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [SmartStrategy(), SmartStrategy(spawn_risk=5, risk_range=10)],
+    ids=["defaults", "tuned"],
+)
+def test_threat_map_matches_calculate_risk(strategy):
+    game = LudoGame()
+    for state, _, _, color in POSITIONS:
+        game.set_state(state)
+        opponents = [
+            player for player in game.players.values() if player.color != color
+        ]
+        threat_map = strategy.calculate_threat_map(opponents)
+        token = Token(color)
+        for square in range(game.BOARD_LENGTH):
+            token.position = square
+            assert threat_map[square] == strategy.calculate_risk(token, opponents)
+
+
+def test_expectimax_table_keeps_leaf_values():
+    game = LudoGame()
+    strategy = ExpectimaxStrategy()
+    strategy.game = game
+    colors = list(game.players)
+    for state, legal_moves, dice_roll, color in POSITIONS:
+        game.set_state(state)
+        for move in legal_moves:
+            undo_record = game.make_move(color, move[0], dice_roll)
+            value = strategy.evaluate_position(color)
+            # The same position on every turn of the game gives the same value
+            for turn in colors:
+                game.turn = turn
+                assert strategy.evaluate(color) == value
+            game.unmake_move(undo_record)
+    assert strategy.transposition_table.hits > 0
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from main import JsonSink, LudoGame
+import simulation_plot_lib
+
+
+def write_results(path, number_of_games):
+    LudoGame().simulate_games(number_of_games, seed=1, sink=JsonSink(str(path)))
+
+
+@pytest.fixture
+def fresh_module(monkeypatch):
+    # Forgets the metrics held in memory, as a new process would
+    def forget():
+        monkeypatch.setattr(simulation_plot_lib, "metrics", None)
+        monkeypatch.setattr(simulation_plot_lib, "results_path", None)
+
+    forget()
+    return forget
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("not expected to be called")
+
+
+def test_metrics_are_cached_until_the_results_change(
+    tmp_path, monkeypatch, fresh_module
+):
+    path = str(tmp_path / "log.json")
+    write_results(path, 20)
+    assert simulation_plot_lib.calculate_metrics(path=path)["n"] == 20
+    assert os.path.exists(simulation_plot_lib.metrics_cache_path(path))
+
+    # Loaded from the cache without reading the results
+    fresh_module()
+    with monkeypatch.context() as patch:
+        patch.setattr(simulation_plot_lib, "load_data", fail)
+        assert simulation_plot_lib.calculate_metrics(path=path)["n"] == 20
+
+    write_results(path, 30)
+    fresh_module()
+    assert simulation_plot_lib.calculate_metrics(path=path)["n"] == 30
+
+
+def test_overwrite_skips_the_cache(tmp_path, monkeypatch, fresh_module):
+    path = str(tmp_path / "log.json")
+    write_results(path, 20)
+    simulation_plot_lib.calculate_metrics(path=path)
+
+    fresh_module()
+    monkeypatch.setattr(simulation_plot_lib, "load_cached_metrics", fail)
+    assert simulation_plot_lib.calculate_metrics(overwrite=True, path=path)["n"] == 20
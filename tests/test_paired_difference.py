@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from compare import PairedDifference, compare_strategies
+from main import RandomStrategy
+
+
+def paired(baseline, candidate, **options):
+    difference = PairedDifference(**options)
+    for baseline_rate, candidate_rate in zip(baseline, candidate):
+        difference.add(baseline_rate, candidate_rate)
+    return difference
+
+
+def test_standard_error_and_interval_known_values():
+    # Differences 1, 0, 0, 1: mean 0.5, sample variance 1/3
+    difference = paired([0, 1, 0, 0], [1, 1, 0, 1], confidence=0.95)
+    assert difference.win_rates() == (0.25, 0.75)
+    assert difference.mean_difference() == 0.5
+    standard_error = math.sqrt(1 / 3 / 4)
+    assert difference.standard_error() == pytest.approx(standard_error)
+
+    low, high = difference.interval()
+    assert low == pytest.approx(0.5 - 1.959964 * standard_error, abs=1e-6)
+    assert high == pytest.approx(0.5 + 1.959964 * standard_error, abs=1e-6)
+
+
+def test_interval_widens_with_checks():
+    single = paired([0, 1, 0, 0], [1, 1, 0, 1], confidence=0.95)
+    repeated = paired([0, 1, 0, 0], [1, 1, 0, 1], confidence=0.95, checks=10)
+    assert repeated.interval_confidence() == pytest.approx(0.995)
+    assert repeated.interval()[0] < single.interval()[0]
+    assert repeated.interval()[1] > single.interval()[1]
+
+
+def test_add_unit_averages_the_antithetic_streams():
+    difference = PairedDifference(streams=2)
+    # wins[strategy][stream][game]
+    difference.add_unit([[[1, 0], [0, 0]], [[1, 1], [1, 0]]])
+    assert difference.pairs == 2
+    assert difference.win_rates() == (0.25, 0.75)
+
+
+def test_settled_once_the_interval_excludes_zero():
+    # Too few pairs, although the candidate won every game
+    assert not paired([0] * 50, [1] * 50, min_pairs=100).settled()
+    assert paired([0] * 100, [1] * 100, min_pairs=100).settled()
+    assert paired([1] * 100, [0] * 100, min_pairs=100).settled()
+
+    # Equal strategies do not settle
+    even = paired([0, 1] * 100, [1, 0] * 100, min_pairs=100)
+    assert even.mean_difference() == 0
+    assert not even.settled()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"number_of_games": 0}, {"unit_size": 0}, {"units_per_check": 0}],
+    ids=["games", "unit_size", "units_per_check"],
+)
+def test_compare_strategies_rejects_empty_settings(options):
+    with pytest.raises(ValueError, match="at least 1"):
+        compare_strategies("yellow", RandomStrategy, RandomStrategy, **options)
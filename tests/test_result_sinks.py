@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+
+from main import ColumnarSink, JsonLinesSink, JsonSink, LudoGame
+import simulation_plot_lib
+
+
+def write_json_lines(
+    path, number_of_games, workers=1, chunk_size=5, seed=1, confidence=None
+):
+    sink = JsonLinesSink(str(path), chunk_size=chunk_size)
+    LudoGame().simulate_games(
+        number_of_games, workers=workers, seed=seed, sink=sink, confidence=confidence
+    )
+    return path.read_text()
+
+
+def test_json_lines_loads_all_games(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write_json_lines(path, 20)
+
+    data = simulation_plot_lib.load_json_lines(str(path))
+    assert data["games_played"] == 20
+    assert all(len(player["games_won"]) == 20 for player in data["players"].values())
+
+
+def test_json_lines_skips_torn_last_line(tmp_path):
+    # Cut the file in the middle of a game line, as a crash during a write would
+    path = tmp_path / "log.jsonl"
+    lines = write_json_lines(path, 20).splitlines(keepends=True)
+    path.write_text("".join(lines[:13]) + lines[13][: len(lines[13]) // 2])
+
+    data = simulation_plot_lib.load_json_lines(str(path))
+    assert data["games_played"] == 12
+
+    metrics = simulation_plot_lib.calculate_metrics(overwrite=True, path=str(path))
+    assert metrics["n"] == 12
+
+
+def test_json_lines_skips_unparsable_last_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    lines = write_json_lines(path, 20).splitlines(keepends=True)
+    path.write_text("".join(lines[:6]) + json.dumps({"red": [1]})[:-2] + "\n")
+
+    assert simulation_plot_lib.load_json_lines(str(path))["games_played"] == 5
+
+
+def test_json_lines_same_for_any_number_of_workers(tmp_path):
+    # Every game is seeded on its own, so the chunks of the workers are
+    # written in the same order with the same games as by one process
+    sequential = write_json_lines(tmp_path / "sequential.jsonl", 30)
+    parallel = write_json_lines(tmp_path / "parallel.jsonl", 30, workers=2)
+    assert parallel == sequential
+
+
+def test_early_stop_same_for_any_number_of_workers(tmp_path):
+    # The workers play smaller chunks, but the ranking is tested at the same
+    # games, so the run stops at the same game with the same checks
+    def run(name, workers):
+        return write_json_lines(
+            tmp_path / name, 400, workers, chunk_size=100, seed=5, confidence=0.5
+        )
+
+    sequential = run("sequential.jsonl", 1)
+    assert sequential == run("parallel.jsonl", 2)
+
+    summary = json.loads(sequential.splitlines()[-1])["summary"]
+    assert summary["sequential_test"]["checks"] == 4
+    assert summary["games_played"] % 100 == 0
+
+
+def assert_metrics_equal(metrics, expected):
+    assert metrics.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, dict):
+            assert_metrics_equal(metrics[name], value)
+        else:
+            assert np.array_equal(metrics[name], value), name
+
+
+def test_columns_give_the_same_metrics_as_json(tmp_path):
+    json_path = str(tmp_path / "log.json")
+    columns_path = str(tmp_path / "log.columns")
+    LudoGame().simulate_games(30, seed=1, sink=JsonSink(json_path))
+    LudoGame().simulate_games(30, seed=1, sink=ColumnarSink(columns_path))
+
+    json_metrics = simulation_plot_lib.calculate_metrics(overwrite=True, path=json_path)
+    columns_metrics = simulation_plot_lib.calculate_metrics(
+        overwrite=True, path=columns_path
+    )
+    assert columns_metrics["n"] == 30
+    assert_metrics_equal(columns_metrics, json_metrics)
+
+    # The plots use the turns of won games, which JSON marks False when lost
+    json_players = simulation_plot_lib.load_results(json_path)["players"]
+    columns_players = simulation_plot_lib.load_results(columns_path)["players"]
+    for color, player_data in json_players.items():
+        assert columns_players[color]["turns_until_win"].tolist() == [
+            turns for turns in player_data["turns_until_win"] if turns is not False
+        ]
@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from main import SequentialTest, wilson_interval
+
+
+def test_wilson_interval_known_values():
+    # 95 % interval of 8 wins in 10 games
+    low, high = wilson_interval(8, 10, 1.959964)
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+
+
+def test_wilson_interval_bounds():
+    assert wilson_interval(0, 0, 1.96) == (0.0, 1.0)
+    low, high = wilson_interval(0, 50, 1.96)
+    assert low == 0.0 and 0 < high < 0.1
+    low, high = wilson_interval(50, 50, 1.96)
+    assert 0.9 < low < 1 and high == 1.0
+
+
+def test_interval_confidence_is_split_over_checks_and_players():
+    test = SequentialTest(confidence=0.9, checks=5)
+    for name in "abcd":
+        test.add(name, 10, 5)
+    assert test.interval_confidence() == pytest.approx(1 - 0.1 / 20)
+
+
+def test_settled_once_intervals_separate():
+    test = SequentialTest(confidence=0.99, min_games=100, checks=10)
+    test.add("strong", 50, 45)
+    test.add("weak", 50, 5)
+    # Too few games, whatever the intervals
+    assert not test.settled()
+
+    test.add("strong", 50, 45)
+    test.add("weak", 50, 5)
+    assert test.settled()
+    assert test.ranking() == ["strong", "weak"]
+    intervals = test.intervals()
+    assert intervals["strong"][0] > intervals["weak"][1]
+
+
+def test_not_settled_with_overlapping_intervals():
+    test = SequentialTest(confidence=0.99, min_games=100, checks=10)
+    test.add("a", 200, 105)
+    test.add("b", 200, 95)
+    assert not test.settled()
+
+    report = test.report()
+    assert report["settled"] is False
+    assert report["games"] == {"a": 200, "b": 200}
+    assert math.isclose(report["win_rates"]["a"], 0.525)
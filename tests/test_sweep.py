@@ -0,0 +1,84 @@
+import pytest
+
+import sweep
+
+# Approach weights times retreat penalties, without the defaults (10, 10)
+CONFIGURATIONS = [
+    {"approach_weight": approach_weight, "retreat_penalty": retreat_penalty}
+    for approach_weight in [2, 5, 20, 40]
+    for retreat_penalty in [1, 5]
+]
+
+
+# Every game counts as (approach_weight + retreat_penalty) / 100 wins, which
+# ranks the configurations without playing, the defaults in the middle
+def fake_unit(strategy_name, parameters, color, opponents, first_game, last_game, seed):
+    score = (parameters["approach_weight"] + parameters["retreat_penalty"]) / 100
+    return [score] * (last_game - first_game)
+
+
+def test_halving_keeps_the_best_and_the_baseline(monkeypatch):
+    monkeypatch.setattr(sweep, "play_configuration_unit", fake_unit)
+    results = sweep.run_sweep(
+        "aggressive",
+        CONFIGURATIONS,
+        min_games=4,
+        max_games=36,
+        eta=3,
+        workers=1,
+        unit_size=4,
+        seed=1,
+    )
+
+    # 9 configurations with the baseline, the best 3 and the baseline play
+    # on, then the best 2 of them and the baseline
+    assert results["rounds"] == [
+        {"games": 4, "configurations": 9},
+        {"games": 12, "configurations": 4},
+        {"games": 36, "configurations": 3},
+    ]
+    games = {
+        (row["parameters"]["approach_weight"], row["parameters"]["retreat_penalty"]): (
+            row["games"],
+            row["dropped_after"],
+        )
+        for row in results["ranking"]
+    }
+    assert games[40, 5] == games[40, 1] == games[10, 10] == (36, None)
+    assert games[20, 5] == (12, 12)
+    assert sum(result == (4, 4) for result in games.values()) == 5
+
+    baseline = next(row for row in results["ranking"] if row["baseline"])
+    assert baseline["parameters"] == {"approach_weight": 10, "retreat_penalty": 10}
+    assert baseline["difference"] == 0
+    assert results["games_played"] == 3 * 36 + 12 + 5 * 4
+
+
+def test_seeded_sweep_rounds():
+    configurations = CONFIGURATIONS[:3]
+    results = sweep.run_sweep(
+        "aggressive",
+        configurations,
+        min_games=2,
+        max_games=4,
+        eta=2,
+        workers=1,
+        unit_size=2,
+        seed=3,
+    )
+    first_round, second_round = results["rounds"]
+    assert first_round == {"games": 2, "configurations": 4}
+    # The best half and the baseline, if it was not among them
+    assert second_round["configurations"] in (2, 3)
+    assert sum(row["games"] == 4 for row in results["ranking"]) == (
+        second_round["configurations"]
+    )
+    assert any(row["baseline"] and row["games"] == 4 for row in results["ranking"])
+
+
+@pytest.mark.parametrize(
+    "min_games, max_games, eta, budgets",
+    [(100, 1000, 3, [100, 300, 900, 1000]), (50, 50, 2, [50]), (200, 100, 3, [100])],
+)
+def test_halving_budgets(min_games, max_games, eta, budgets):
+    assert sweep.halving_budgets(min_games, max_games, eta) == budgets
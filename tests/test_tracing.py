@@ -0,0 +1,64 @@
+import random
+from collections import Counter
+
+import pytest
+
+import main
+from main import DiceStream, LudoGame, TraceEventKind
+
+MOVE_KINDS = (TraceEventKind.spawn, TraceEventKind.move, TraceEventKind.home)
+
+
+def play_seeded(game, game_number):
+    random.seed(game_number)
+    game.dice.reseed(game_number)
+    game.reset_game()
+    game.choose_starting_player()
+    game.play_game()
+
+
+@pytest.mark.parametrize("game_number", range(5))
+def test_events_agree_with_the_stats(game_number):
+    game = LudoGame(dice=DiceStream(record=True))
+    events = []
+    game.tracer.attach(events.append)
+    play_seeded(game, game_number)
+
+    # Every roll of the game, in order
+    assert [
+        event.dice_value for event in events if event.kind == TraceEventKind.roll
+    ] == game.dice.rolls
+
+    kinds = Counter((event.kind, event.color) for event in events)
+    beaten = Counter(
+        event.other_color for event in events if event.kind == TraceEventKind.capture
+    )
+    for color, player in game.players.items():
+        stats = player.stats
+        moves = [
+            event for event in events if event.kind in MOVE_KINDS and event.color == color
+        ]
+        assert kinds[TraceEventKind.spawn, color] == stats.spawns
+        assert len(moves) == stats.turns_taken
+        assert sum(event.dice_value for event in moves) == stats.total_squares_moved
+        assert kinds[TraceEventKind.capture, color] == stats.tokens_captured
+        assert beaten[color] == stats.tokens_beaten
+        assert kinds[TraceEventKind.win, color] == int(stats.game_won)
+
+    assert events[-1].kind == TraceEventKind.win
+    assert sum(player.stats.game_won for player in game.players.values()) == 1
+
+
+def test_no_events_are_built_without_sinks(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("event built without a sink")
+
+    game = LudoGame()
+    events = []
+    game.tracer.attach(events.append)
+    game.tracer.detach(events.append)
+    assert not game.tracer.enabled
+
+    monkeypatch.setattr(main, "TraceEvent", fail)
+    play_seeded(game, 1)
+    assert events == []
@@ -0,0 +1,348 @@
+import argparse
+import contextlib
+from itertools import combinations, permutations
+import json
+import os
+import random
+import time
+
+from main import STRATEGIES, LudoGame, SequentialTest
+
+DEFAULT_STRATEGIES = ["aggressive", "defensive", "smart", "speedrun"]
+
+
+## Schedule
+# Every assignment of the strategies to seats, for every number of players.
+# A lineup is a tuple of (color, strategy name) pairs in seating order
+def tournament_lineups(strategy_names, player_counts=(4,)) -> list[tuple]:
+    lineups = []
+    for number_of_players in player_counts:
+        for colors in combinations(LudoGame.STARTING_POSITIONS, number_of_players):
+            for strategies in permutations(strategy_names, number_of_players):
+                lineups.append(tuple(zip(colors, strategies)))
+    return lineups
+
+
+# Work units of at most unit_size games, round robin over the lineups so that
+# every lineup progresses at the same pace
+def work_units(number_of_lineups, first_game, last_game, unit_size) -> list[tuple]:
+    return [
+        (lineup_index, first, min(first + unit_size, last_game))
+        for first in range(first_game, last_game, unit_size)
+        for lineup_index in range(number_of_lineups)
+    ]
+
+
+## Workers
+# Games of the lineups a worker has played, built once per process
+_lineup_games: dict[tuple, LudoGame] = {}
+
+
+def play_unit(lineup, first_game, last_game, seed) -> dict[str, int]:
+    game = _lineup_games.get(lineup)
+    if game is None:
+        game = LudoGame(
+            strategies={color: STRATEGIES[name]() for color, name in lineup},
+            colors=[color for color, _ in lineup],
+        )
+        _lineup_games[lineup] = game
+
+    # Game numbers are seeded the same in every lineup, so all lineups play
+    # with the same dice
+    with contextlib.redirect_stdout(None):
+        games, _, _ = game.simulate_game_range(first_game, last_game, seed)
+    return {color: sum(record[color][-1] for record in games) for color, _ in lineup}
+
+
+# Plays the units on a pool of processes, workers take the next unit when they
+# are done, so long games do not hold up the others. Yields the finished units
+def play_units(lineups, units, seed, executor=None):
+    if executor is None:
+        for lineup_index, first_game, last_game in units:
+            wins = play_unit(lineups[lineup_index], first_game, last_game, seed)
+            yield lineup_index, last_game - first_game, wins
+        return
+
+    from concurrent.futures import as_completed
+
+    futures = {
+        executor.submit(play_unit, lineups[lineup_index], first, last, seed): (
+            lineup_index,
+            last - first,
+        )
+        for lineup_index, first, last in units
+    }
+    for future in as_completed(futures):
+        lineup_index, number_of_games = futures[future]
+        yield lineup_index, number_of_games, future.result()
+
+
+## Results
+def new_lineup_results(lineups) -> list[dict]:
+    return [
+        {
+            "seats": dict(lineup),
+            "games": 0,
+            "wins": {color: 0 for color, _ in lineup},
+        }
+        for lineup in lineups
+    ]
+
+
+def add_unit(lineup_results, lineup_index, number_of_games, wins):
+    lineup_result = lineup_results[lineup_index]
+    lineup_result["games"] += number_of_games
+    for color, color_wins in wins.items():
+        lineup_result["wins"][color] += color_wins
+
+
+# Win rates per strategy, per strategy and seat, and of every pair of
+# strategies against each other. strength is the number of wins relative to
+# the wins of an average player, 1 / players of every game
+def strength_matrix(strategy_names, lineup_results) -> dict:
+    games = {name: 0 for name in strategy_names}
+    wins = {name: 0 for name in strategy_names}
+    expected_wins = {name: 0.0 for name in strategy_names}
+    seat_games = {name: {} for name in strategy_names}
+    seat_wins = {name: {} for name in strategy_names}
+    pair_wins = {
+        name: {other: 0 for other in strategy_names} for name in strategy_names
+    }
+
+    for lineup_result in lineup_results:
+        seats = lineup_result["seats"]
+        number_of_games = lineup_result["games"]
+        for color, name in seats.items():
+            color_wins = lineup_result["wins"][color]
+            games[name] += number_of_games
+            wins[name] += color_wins
+            expected_wins[name] += number_of_games / len(seats)
+            seat_games[name][color] = seat_games[name].get(color, 0) + number_of_games
+            seat_wins[name][color] = seat_wins[name].get(color, 0) + color_wins
+            for other in seats.values():
+                if other != name:
+                    pair_wins[name][other] += color_wins
+
+    strategies = {
+        name: {
+            "games": games[name],
+            "wins": wins[name],
+            "win_rate": wins[name] / games[name] if games[name] else None,
+            "strength": wins[name] / expected_wins[name] if games[name] else None,
+        }
+        for name in strategy_names
+    }
+    seats = {
+        name: {
+            color: seat_wins[name][color] / seat_games[name][color]
+            for color in LudoGame.STARTING_POSITIONS
+            if seat_games[name].get(color)
+        }
+        for name in strategy_names
+    }
+    # Share of the games won by one of the two that the first one won
+    head_to_head = {
+        name: {
+            other: (
+                pair_wins[name][other]
+                / (pair_wins[name][other] + pair_wins[other][name])
+                if other != name and pair_wins[name][other] + pair_wins[other][name]
+                else None
+            )
+            for other in strategy_names
+        }
+        for name in strategy_names
+    }
+    return {"strategies": strategies, "seats": seats, "head_to_head": head_to_head}
+
+
+def format_rate(rate) -> str:
+    return f"{rate:>9.3f}" if rate is not None else f"{'-':>9}"
+
+
+def print_strength_matrix(matrix):
+    strategies = matrix["strategies"]
+    ranking = sorted(strategies, key=lambda name: strategies[name]["strength"] or 0)
+    ranking.reverse()
+
+    print(f"{'strategy':<12} {'games':>9} {'wins':>9} {'win rate':>9} {'strength':>9}")
+    for name in ranking:
+        row = strategies[name]
+        print(
+            f"{name:<12} {row['games']:>9} {row['wins']:>9} "
+            f"{format_rate(row['win_rate'])} {format_rate(row['strength'])}"
+        )
+
+    colors = list(LudoGame.STARTING_POSITIONS)
+    print(
+        f"\nWin rate by seat\n{'strategy':<12} " + " ".join(f"{c:>9}" for c in colors)
+    )
+    for name in ranking:
+        seat_rates = matrix["seats"][name]
+        print(
+            f"{name:<12} "
+            + " ".join(format_rate(seat_rates.get(color)) for color in colors)
+        )
+
+    print(
+        f"\nHead to head, share of the wins against the column strategy\n{'':<12} "
+        + " ".join(f"{name[:9]:>9}" for name in ranking)
+    )
+    for name in ranking:
+        print(
+            f"{name:<12} "
+            + " ".join(format_rate(matrix["head_to_head"][name][o]) for o in ranking)
+        )
+
+
+## Tournament
+def run_tournament(
+    strategy_names=DEFAULT_STRATEGIES,
+    games_per_lineup: int = 100,
+    player_counts=(4,),
+    workers: int | None = None,
+    unit_size: int = 25,
+    seed: int | None = None,
+    confidence: float | None = None,
+) -> dict:
+    for name in strategy_names:
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {name}.")
+    for number_of_players in player_counts:
+        if not 2 <= number_of_players <= min(4, len(strategy_names)):
+            raise ValueError(
+                f"Cannot seat {number_of_players} of {len(strategy_names)} strategies."
+            )
+    if games_per_lineup < 0:
+        raise ValueError("games_per_lineup can not be negative.")
+    if unit_size < 1:
+        raise ValueError("unit_size has to be at least 1.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    lineups = tournament_lineups(strategy_names, player_counts)
+    lineup_results = new_lineup_results(lineups)
+    print(f"Playing {len(lineups)} lineups with up to {games_per_lineup} games each...")
+
+    # With a confidence, games_per_lineup is the budget and the lineups are
+    # played in rounds of one unit each, until the strategies are ranked at
+    # that confidence
+    if confidence is None:
+        rounds = [(0, games_per_lineup)]
+    else:
+        rounds = [
+            (first_game, min(first_game + unit_size, games_per_lineup))
+            for first_game in range(0, games_per_lineup, unit_size)
+        ]
+    sequential_test = None
+
+    start_time = time.perf_counter()
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for first_game, last_game in rounds:
+            units = work_units(len(lineups), first_game, last_game, unit_size)
+            for finished_unit in play_units(lineups, units, seed, executor):
+                add_unit(lineup_results, *finished_unit)
+
+            if confidence is not None:
+                sequential_test = SequentialTest(confidence, checks=len(rounds))
+                strategies = strength_matrix(strategy_names, lineup_results)
+                for name, row in strategies["strategies"].items():
+                    sequential_test.add(name, row["games"], row["wins"])
+                if sequential_test.settled():
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - start_time
+
+    games_played = sum(lineup_result["games"] for lineup_result in lineup_results)
+    results = {
+        "settings": {
+            "strategies": list(strategy_names),
+            "games_per_lineup": games_per_lineup,
+            "player_counts": list(player_counts),
+            "seed": seed,
+            "confidence": confidence,
+        },
+        "games_played": games_played,
+        "seconds": elapsed,
+        **strength_matrix(strategy_names, lineup_results),
+        "lineups": lineup_results,
+    }
+    if sequential_test is not None:
+        results["sequential_test"] = sequential_test.report()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play every assignment of strategies to seats."
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=STRATEGIES,
+        default=DEFAULT_STRATEGIES,
+        help="strategies taking part",
+    )
+    parser.add_argument("-n", "--games", type=int, default=100, help="games per lineup")
+    parser.add_argument(
+        "--players",
+        type=int,
+        nargs="+",
+        choices=[2, 3, 4],
+        default=[4],
+        help="numbers of players per game, smaller games seat every subset",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--unit-size", type=int, default=25, help="games per work unit")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the games")
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=None,
+        help="stop once the strategies are ranked at this confidence, --games is "
+        "then the maximum per lineup",
+    )
+    parser.add_argument(
+        "-o", "--output", default="tournament.json", help="results file"
+    )
+    args = parser.parse_args()
+
+    try:
+        results = run_tournament(
+            args.strategies,
+            args.games,
+            args.players,
+            args.workers,
+            args.unit_size,
+            args.seed,
+            args.confidence,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    print_strength_matrix(results)
+    if "sequential_test" in results:
+        sequential_test = results["sequential_test"]
+        settled = "settled" if sequential_test["settled"] else "not settled"
+        print(f"\nRanking {settled} at {sequential_test['confidence']} confidence")
+        for name in sequential_test["ranking"]:
+            low, high = sequential_test["intervals"][name]
+            print(
+                f"{name:<12} {sequential_test['win_rates'][name]:.3f} "
+                f"[{low:.3f}, {high:.3f}]"
+            )
+    print(
+        f"\nPlayed {results['games_played']} games in {results['seconds']:.2f} s "
+        f"({results['games_played'] / results['seconds']:.1f} games/s)"
+    )
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)